@@ -1,22 +1,12 @@
 from fetchers import WikiFetcher
-from parsers import WikiSectionParser
 from storers import PineconeStorer
 from model_connectors import GoogleEmbeddingAdapter
+from pipeline import run_pipeline
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-print('fetching laws...')
-#TODO: change to fetch_all() in production
-laws = WikiFetcher.test_fetch_all()
-print('laws fetched successfuly')
-chunks = []
-for law in laws:
-    chuck_item = WikiSectionParser.parse(law['content'])
-    chunks.extend(chuck_item)
-print('laws chunked successfuly')
-
 adapter = GoogleEmbeddingAdapter(api_key=os.getenv('GOOGLE_API_KEY'))
 
 embedding_dimension = 768
@@ -28,6 +18,13 @@ storer = PineconeStorer(
     embedding_adapter=adapter
     )
 print('storer initialized successfuly')
-print('storing in Pinecone DB')
-results = storer.store(chunks)
+
+print('listing laws...')
+#TODO: list all laws in production
+law_names = [l['law_name'] for l in WikiFetcher.list_laws(max_laws=50)]
+print(f'found {len(law_names)} laws')
+#Fetching, chunking and embedding+storing run concurrently, one batch of chunks at a time
+print('fetching, chunking and storing laws...')
+summary = run_pipeline(storer, law_names)
+print(f"stored {summary['chunks']} chunks of {summary['laws']} laws, {len(summary['failed_laws'])} laws failed")
 print('storing completed successfuly')
@@ -1,8 +1,35 @@
 from queue import Queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import os
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib.parse import quote
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 from typing import Optional, List, Dict, Any
-import time
+
+try:
+    import httpx
+    import h2  # noqa: F401  HTTP/2 support(httpx[http2]), httpx.AsyncClient(http2=True) fails without it
+except ImportError:  # fetch_all falls back to a thread pool
+    httpx = None
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)",
+    "Connection": "keep-alive"
+}
+
+# Gateway errors worth retrying, any other error status fails right away
+RETRY_STATUSES = (502, 503, 504)
+
+def _in_event_loop() -> bool:
+    """Whether the calling thread is running an asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
 
 class FetcherError(Exception):
     """Base exception for fetcher operations"""
@@ -26,8 +53,59 @@ class Fetcher:
         pass
 
 class WikiFetcher(Fetcher):
-    @staticmethod
-    def fetch_one(resource: str, timeout: int = 30, retries: int = 3) -> Optional[str]:
+    #One pooled keep-alive session per retry policy, shared by all requests
+    _sessions: Dict[int, requests.Session] = {}
+
+    #Raw wikitext of a law(text/plain, no HTML to parse), the quoted law name goes between prefix and suffix
+    _URL_PREFIX = 'https://he.wikisource.org/w/index.php?title=מקור:'
+    _URL_SUFFIX = '&action=raw'
+
+    @classmethod
+    def law_url(cls, resource: str) -> str:
+        '''
+        Returns the wikisource URL of a law, quoting reserved characters(&, ?, / ...) in its name.
+
+        Args:
+        - resource(string) - law name
+        '''
+        return f"{cls._URL_PREFIX}{quote(resource.replace(' ', '_'), safe='')}{cls._URL_SUFFIX}"
+
+    @classmethod
+    def get_session(cls, retries: int = 3) -> requests.Session:
+        '''
+        Returns the shared session for he.wikisource.org, creating it on first use.
+        If the WIKI_CACHE environment variable is set, responses are cached on disk
+        under ./.cache for a day(WIKI_CACHE=filesystem stores one file per page,
+        any other value uses a single sqlite file).
+
+        Args:
+        - retries(int) - number of retry attempts for failed connections and 502/503/504 responses
+        Returns:
+            requests.Session with a pooled HTTPAdapter mounted for http and https
+        '''
+        session = cls._sessions.get(retries)
+        if session is None:
+            cache = os.getenv('WIKI_CACHE')
+            if cache:
+                import requests_cache
+                session = requests_cache.CachedSession(
+                    cache_name='./.cache/wiki',
+                    backend='filesystem' if cache == 'filesystem' else 'sqlite',
+                    # MediaWiki sends max-age=0 on action=raw, honoring it(cache_control=True) would expire every page at once
+                    expire_after=86400
+                )
+            else:
+                session = requests.Session()
+            retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=RETRY_STATUSES)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=20, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(HEADERS)
+            cls._sessions[retries] = session
+        return session
+
+    @classmethod
+    def fetch_one(cls, resource: str, timeout: int = 30, retries: int = 3) -> Optional[str]:
         '''
         Fetches the law content from WikiText(ספר החוקים הפתוח) by law name(in hebrew).
 
@@ -40,100 +118,173 @@ class WikiFetcher(Fetcher):
         Raises:
             ValueError: If resource is empty or None
             NetworkError: If network request fails after all retries
-            ParseError: If HTML parsing fails
+            FetcherError: If other unexpected errors occur
         '''
         if not resource or not resource.strip():
             raise ValueError("Resource name cannot be empty or None")
         
-        #Set the endpoint
-        url = 'https://he.wikisource.org/w/index.php?title=מקור:{law_name}&action=edit'
-        formatted_url = url.format(law_name=resource).replace(' ', '_')
-        
-        #Set the request
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
+        #Set the request(retries are handled by the session's adapter)
+        try:
+            response = cls.get_session(retries).get(cls.law_url(resource), timeout=timeout)
+            # action=raw answers 404 for a law with no page
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()  # Raise an exception for HTTP errors
+        except requests.RequestException as e:
+            raise NetworkError(f"Failed to fetch resource '{resource}' after {retries} attempts: {e}")
+        except Exception as e:
+            raise FetcherError(f"Unexpected error fetching resource '{resource}': {e}")
         
+        #The response body is the law's wikitext
+        content = response.text.strip()
+        return content or None
+
+    @staticmethod
+    async def _fetch_one_async(client: 'httpx.AsyncClient', resource: str, sem: asyncio.Semaphore,
+                               timeout: int = 30, retries: int = 3) -> Optional[str]:
+        '''
+        Async version of fetch_one, used by fetch_all to fetch many laws concurrently.
+
+        Args:
+        - client(httpx.AsyncClient) - shared HTTP/2 client for all requests
+        - resource(string) - law name to fetch
+        - sem(asyncio.Semaphore) - limits the number of requests in flight
+        - timeout(int) - request timeout in seconds
+        - retries(int) - number of retry attempts
+        Returns:
+            The law content as a string, or None if not found
+        Raises:
+            ValueError: If resource is empty or None
+            NetworkError: If network request fails after all retries
+            FetcherError: If other unexpected errors occur
+        '''
+        if not resource or not resource.strip():
+            raise ValueError("Resource name cannot be empty or None")
+
+        formatted_url = WikiFetcher.law_url(resource)
+
         for attempt in range(retries):
             try:
-                response = requests.get(formatted_url, headers=headers, timeout=timeout)
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                
-                # Parse HTML
-                try:
-                    soup = BeautifulSoup(response.text, "lxml")
-                except Exception as e:
-                    raise ParseError(f"Failed to parse HTML content: {e}")
-
-                #Get the content
-                law_content = soup.find(id='wpTextbox1')
-                if law_content:
-                    content = law_content.get_text(strip=True)
-                    if not content:
-                        return None
-                    return content
-                else:
+                async with sem:
+                    response = await client.get(formatted_url, timeout=timeout)
+                if response.status_code == 404:
                     return None
-                    
-            except requests.RequestException as e:
+                response.raise_for_status()
+                content = response.text.strip()
+                return content or None
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES:
+                    raise NetworkError(f"Failed to fetch resource '{resource}': {e}")
+                if attempt == retries - 1:
+                    raise NetworkError(f"Failed to fetch resource '{resource}' after {retries} attempts: {e}")
+                await asyncio.sleep(1)
+
+            except httpx.HTTPError as e:
                 if attempt == retries - 1:  # Last attempt
                     raise NetworkError(f"Failed to fetch resource '{resource}' after {retries} attempts: {e}")
-                time.sleep(1)  # Brief pause before retry
-                
+                await asyncio.sleep(1)  # Brief pause before retry
+
             except Exception as e:
                 if attempt == retries - 1:
                     raise FetcherError(f"Unexpected error fetching resource '{resource}': {e}")
-                time.sleep(1)
-        
+                await asyncio.sleep(1)
+
         return None
+
     @staticmethod
-    def fetch_all(timeout: int = 30, retries: int = 3, max_laws: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def _fetch_many_async(law_names: List[str], timeout: int = 30, retries: int = 3,
+                                concurrency: int = 10) -> List[Any]:
         '''
-        Fetches all available laws from WikiSource.
-        
+        Fetches many laws concurrently, multiplexed as HTTP/2 streams over one connection.
+
         Args:
+        - law_names(list) - law names to fetch
         - timeout(int) - request timeout in seconds
         - retries(int) - number of retry attempts
-        - max_laws(int) - maximum number of laws to fetch (None for all)
+        - concurrency(int) - maximum number of requests in flight(wikisource politeness)
         Returns:
-            List of dictionaries containing law names and content
+            List in the same order as law_names, holding the law content
+            or the exception raised while fetching it
+        '''
+        sem = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        #Connection is a hop-by-hop header, not allowed on HTTP/2
+        headers = {"User-Agent": HEADERS["User-Agent"]}
+        #The client is bound to the running event loop, so it lives for one fetch_all call
+        async with httpx.AsyncClient(http2=True, headers=headers, limits=limits, timeout=timeout) as client:
+            tasks = [WikiFetcher._fetch_one_async(client, name, sem, timeout=timeout, retries=retries)
+                     for name in law_names]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _fetch_many_threaded(law_names: List[str], timeout: int = 30, retries: int = 3,
+                             max_workers: int = 16) -> List[Any]:
+        '''
+        Fetches many laws on a thread pool, used by fetch_all when httpx is not installed.
+        The threads share the pooled keep-alive session of fetch_one.
+
+        Args:
+        - law_names(list) - law names to fetch
+        - timeout(int) - request timeout in seconds
+        - retries(int) - number of retry attempts
+        - max_workers(int) - number of threads
+        Returns:
+            List in the same order as law_names, holding the law content
+            or the exception raised while fetching it
+        '''
+        results: List[Any] = [None] * len(law_names)
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futures = {ex.submit(WikiFetcher.fetch_one, name, timeout, retries): i
+                       for i, name in enumerate(law_names)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = e
+        return results
+
+    @staticmethod
+    def list_laws(timeout: int = 30, retries: int = 3, max_laws: Optional[int] = None) -> List[Dict[str, str]]:
+        '''
+        Fetches the names and links of all available laws from WikiSource.
+
+        Args:
+        - timeout(int) - request timeout in seconds
+        - retries(int) - number of retry attempts
+        - max_laws(int) - maximum number of laws to list (None for all)
+        Returns:
+            List of dictionaries containing law names and urls
         Raises:
             NetworkError: If network request fails
-            ParseError: If HTML parsing fails
-            FetcherError: If other unexpected errors occur
+            ParseError: If HTML parsing fails or no laws are found
         '''
         url = "https://he.wikisource.org/wiki/%D7%A1%D7%A4%D7%A8_%D7%94%D7%97%D7%95%D7%A7%D7%99%D7%9D_%D7%94%D7%A4%D7%AA%D7%95%D7%97"
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
         
         try:
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = WikiFetcher.get_session(retries).get(url, timeout=timeout)
             response.raise_for_status()
         except requests.RequestException as e:
             raise NetworkError(f"Failed to fetch law list page: {e}")
 
         # Parse HTML
         try:
-            soup = BeautifulSoup(response.text, "lxml")
+            tree = HTMLParser(response.text)
         except Exception as e:
             raise ParseError(f"Failed to parse law list HTML: {e}")
 
         #Get law names and links
         root_url = 'https://he.wikisource.org'
-        law_html_elements = soup.select("dd a")
+        law_html_elements = tree.css("dd a")
         
         if not law_html_elements:
             raise ParseError("No law links found on the page")
         
-        law_items = []
-        for l in law_html_elements:
-            try:
-                if 'href' not in l.attrs:
-                    continue
-                url = root_url + l['href']
-                law_name = l.text.strip()
-                if law_name:  # Skip empty law names
-                    law_items.append({'law_name': law_name, 'url': url})
-            except Exception as e:
-                # Log and skip problematic elements rather than failing completely
-                continue
+        # Skip anchors without a link or with an empty law name
+        law_items = [{'law_name': law_name, 'url': root_url + href}
+                     for l in law_html_elements
+                     if (href := l.attributes.get('href')) and (law_name := l.text(strip=True))]
         
         if not law_items:
             raise ParseError("No valid law items found")
@@ -141,22 +292,49 @@ class WikiFetcher(Fetcher):
         # Limit number of laws if specified
         if max_laws is not None and max_laws > 0:
             law_items = law_items[:max_laws]
+        
+        return law_items
+
+    @staticmethod
+    def fetch_all(timeout: int = 30, retries: int = 3, max_laws: Optional[int] = None) -> List[Dict[str, Any]]:
+        '''
+        Fetches all available laws from WikiSource.
+        
+        Args:
+        - timeout(int) - request timeout in seconds
+        - retries(int) - number of retry attempts
+        - max_laws(int) - maximum number of laws to fetch (None for all)
+        Returns:
+            List of dictionaries containing law names and content
+        Raises:
+            NetworkError: If network request fails
+            ParseError: If HTML parsing fails
+            FetcherError: If other unexpected errors occur
+        '''
+        law_items = WikiFetcher.list_laws(timeout=timeout, retries=retries, max_laws=max_laws)
+
+        # Fetch the laws concurrently
+        law_names = [l['law_name'] for l in law_items]
+        # The disk cache lives on the requests session, so cached runs use the threaded path,
+        # as do calls from inside a running event loop(asyncio.run can't be nested)
+        if httpx is not None and not os.getenv('WIKI_CACHE') and not _in_event_loop():
+            results = asyncio.run(WikiFetcher._fetch_many_async(law_names, timeout=timeout, retries=retries))
+        else:
+            results = WikiFetcher._fetch_many_threaded(law_names, timeout=timeout, retries=retries)
 
         law_contents = []
         failed_laws = []
         
-        for l in law_items:
-            try:
-                content = WikiFetcher.fetch_one(l['law_name'], timeout=timeout, retries=retries)
-                name_and_content = {
-                    'law_name': l['law_name'],
-                    'content': content
-                }
-                law_contents.append(name_and_content)
-            except Exception as e:
+        for l, content in zip(law_items, results):
+            if isinstance(content, Exception):
                 # Log failed laws but continue processing others
-                failed_laws.append({'law_name': l['law_name'], 'error': str(e)})
+                failed_laws.append({'law_name': l['law_name'], 'error': str(content)})
                 continue
+            name_and_content = {
+                'law_name': l['law_name'],
+                'content': content
+            }
+            law_contents.append(name_and_content)
         
         if not law_contents and failed_laws:
             raise FetcherError(f"Failed to fetch any laws. Sample errors: {failed_laws[:3]}")
@@ -164,30 +342,5 @@ class WikiFetcher(Fetcher):
         return law_contents
     @staticmethod
     def test_fetch_all():
-        url = "https://he.wikisource.org/wiki/%D7%A1%D7%A4%D7%A8_%D7%94%D7%97%D7%95%D7%A7%D7%99%D7%9D_%D7%94%D7%A4%D7%AA%D7%95%D7%97"
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
-        response = requests.get(url, headers=headers)
-
-        # Parse HTML
-        soup = BeautifulSoup(response.text, "lxml")
-
-
-        #Maybe optinize to one loop
-        #Get law names and links
-        root_url = 'https://he.wikisource.org'
-        law_html_elements = soup.select("dd a")
-        law_items = []
-        for l in law_html_elements[:50]:
-            url = root_url + l['href']
-            law_name = l.text
-            law_items.append({'law_name': law_name, 'url': url})
-
-        law_contents = []
-        for l in law_items:
-            name_and_content = {
-                'law_name': l['law_name'],
-                'content': WikiFetcher.fetch_one(l['law_name'])
-            }
-            law_contents.append(name_and_content)
-        
-        return law_contents
\ No newline at end of file
+        #Fetch only the first 50 laws
+        return WikiFetcher.fetch_all(max_laws=50)
\ No newline at end of file
@@ -1,10 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
+import argparse
 import csv
+from fetchers import WikiFetcher
+
+parser = argparse.ArgumentParser(description="Scrape law names and links into output_dict.csv")
+parser.add_argument('--verbose', action='store_true', help="print every law name and link")
+args = parser.parse_args()
 
 url = "https://he.wikisource.org/wiki/%D7%A1%D7%A4%D7%A8_%D7%94%D7%97%D7%95%D7%A7%D7%99%D7%9D_%D7%94%D7%A4%D7%AA%D7%95%D7%97"
-headers = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
-response = requests.get(url, headers=headers)
+response = WikiFetcher.get_session().get(url)
 
 # Parse HTML
 soup = BeautifulSoup(response.text, "lxml")
@@ -12,20 +16,15 @@ soup = BeautifulSoup(response.text, "lxml")
 # Get the page title
 print(soup.title.string)
 
-#Get law names and links
+#Get law names and links, streaming them straight into the csv file
 root_url = 'https://he.wikisource.org'
-law_html_elements = soup.select("dd a")
-law_items = []
-for l in law_html_elements:
-    url = root_url + l['href']
-    law_name = l.text
-    law_items.append({'law_name': law_name, 'url': url})
-
-#print them and storing in csv file
-for item in law_items:
-    print(f'name: {item.get("law_name")}, link: {item.get("url")}')
-
-with open('output_dict.csv', 'w', newline='') as csvfile:
+with open('output_dict.csv', 'w', newline='', buffering=1 << 20) as csvfile:
     writer = csv.DictWriter(csvfile, fieldnames=['law_name', 'url'])
     writer.writeheader() # Writes the header row
-    writer.writerows(law_items)
\ No newline at end of file
+    for l in soup.select("dd a"):
+        if not l.get('href'):
+            continue
+        item = {'law_name': l.get_text(strip=True), 'url': root_url + l['href']}
+        writer.writerow(item)
+        if args.verbose:
+            print(f'name: {item.get("law_name")}, link: {item.get("url")}')
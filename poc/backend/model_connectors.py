@@ -1,10 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import ExitStack
+from itertools import chain
+import hashlib
 import os
+import queue
+import sqlite3
+import threading
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_huggingface import HuggingFaceEndpointEmbeddings
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+# Provider SDKs(langchain_google_genai, langchain_huggingface, sentence_transformers/torch)
+# are imported by their adapter on first use, so only the requested provider is loaded
 
 class EmbeddingError(Exception):
     """Base exception for embedding operations"""
@@ -22,11 +32,147 @@ class ConfigurationError(EmbeddingError):
     """Exception for configuration errors"""
     pass
 
+def _is_retryable(error: BaseException) -> bool:
+    """Whether an embedding API error is a rate limit(429) or server(5xx) error"""
+    status = getattr(error, 'code', None)
+    if not isinstance(status, int):
+        status = getattr(error, 'status_code', None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+# Retry throttled/failed API calls with exponential backoff
+_retry_on_api_error = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential(multiplier=0.5, max=10),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+
+def _embed_in_batches(embed_fn: Callable[[List[str]], List[List[float]]],
+                      texts: List[str],
+                      batch_size: int,
+                      concurrency: int) -> np.ndarray:
+    """
+    Split texts into batches and embed them concurrently, preserving order
+    
+    Args:
+        embed_fn: Function embedding a single batch of texts
+        texts: List of document texts to embed
+        batch_size: Maximum number of texts per API request
+        concurrency: Maximum number of requests in flight
+        
+    Returns:
+        float32 array of shape (len(texts), dim), rows in the same order as texts
+    """
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    embed_batch = _retry_on_api_error(embed_fn)
+    
+    if len(batches) == 1:
+        return np.asarray(embed_batch(batches[0]), dtype=np.float32)
+    
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as ex:
+        results = list(ex.map(embed_batch, batches))
+    return np.asarray(list(chain.from_iterable(results)), dtype=np.float32)
+
+class _EmbeddingCache:
+    """Persistent embedding store keyed by SHA-256 of (model name, text)"""
+    
+    # sqlite limit on bound parameters per statement
+    _MAX_VARS = 500
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: sqlite file path, parent directories are created if missing
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+    
+    @staticmethod
+    def key(model_name: str, text: str) -> bytes:
+        return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return the cached vectors found for keys"""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self._MAX_VARS):
+                chunk = keys[i:i + self._MAX_VARS]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+    
+    def put_many(self, items: Dict[bytes, np.ndarray]):
+        """Store vectors by key"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+def _open_cache(cache_path: Optional[str]) -> Optional[_EmbeddingCache]:
+    """Open the embedding cache at cache_path or EMBEDDING_CACHE, None if neither is set"""
+    cache_path = cache_path or os.getenv('EMBEDDING_CACHE')
+    if not cache_path:
+        return None
+    try:
+        return _EmbeddingCache(cache_path)
+    except Exception as e:
+        raise ConfigurationError(f"Failed to open embedding cache '{cache_path}': {e}")
+
+def _embed_with_cache(cache: Optional[_EmbeddingCache],
+                      model_name: str,
+                      embed_fn: Callable[[List[str]], np.ndarray],
+                      texts: List[str]) -> np.ndarray:
+    """
+    Embed texts, calling embed_fn only for texts missing from the cache
+    
+    Args:
+        cache: Embedding cache, or None to always call embed_fn
+        model_name: Model name, part of the cache key
+        embed_fn: Function embedding a list of texts
+        texts: List of document texts to embed
+        
+    Returns:
+        float32 array of embedding vectors, rows in the same order as texts
+    """
+    if cache is None:
+        return embed_fn(texts)
+    
+    keys = [_EmbeddingCache.key(model_name, t) for t in texts]
+    vectors = cache.get_many(list(set(keys)))
+    
+    # Each missing text is embedded once, even if it repeats
+    misses = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            misses.setdefault(key, text)
+    
+    if misses:
+        new_vectors = dict(zip(misses.keys(), embed_fn(list(misses.values()))))
+        cache.put_many(new_vectors)
+        vectors.update(new_vectors)
+    
+    return np.stack([vectors[key] for key in keys])
+
+def _no_embeddings(dim: Optional[int] = None) -> np.ndarray:
+    """Embeddings of an empty texts list, a (0, dim) float32 array like any other result(dim 0 if unknown)"""
+    return np.empty((0, dim or 0), dtype=np.float32)
+
 class EmbeddingAdapter(ABC):
     """Abstract base class for embedding model adapters"""
     
     @abstractmethod
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """
         Embed a list of documents
         
@@ -34,7 +180,7 @@ class EmbeddingAdapter(ABC):
             texts: List of document texts to embed
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dim)
             
         Raises:
             ValueError: If texts is None or contains invalid items
@@ -64,7 +210,14 @@ class EmbeddingAdapter(ABC):
 class GoogleEmbeddingAdapter(EmbeddingAdapter):
     """Adapter for Google embeddings"""
     
-    def __init__(self, model_name: str = "models/embedding-001", api_key: Optional[str] = None):
+    # Google API rejects more than 100 texts per request
+    _BATCH = 100
+    _CONCURRENCY = 8
+    
+    def __init__(self,
+                 model_name: str = "models/embedding-001",
+                 api_key: Optional[str] = None,
+                 cache_path: Optional[str] = None):
         if not model_name or not model_name.strip():
             raise ValueError("Model name cannot be empty")
         
@@ -74,7 +227,10 @@ class GoogleEmbeddingAdapter(EmbeddingAdapter):
         if not self.api_key:
             raise ConfigurationError("Google API key must be provided via parameter or GOOGLE_API_KEY environment variable")
         
+        self._cache = _open_cache(cache_path)
+        
         try:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
             self.embeddings = GoogleGenerativeAIEmbeddings(
                 model=model_name,
                 google_api_key=self.api_key
@@ -82,7 +238,10 @@ class GoogleEmbeddingAdapter(EmbeddingAdapter):
         except Exception as e:
             raise ModelLoadError(f"Failed to initialize Google embeddings model '{model_name}': {e}")
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def _embed_batches(self, texts: List[str]) -> np.ndarray:
+        return _embed_in_batches(self.embeddings.embed_documents, texts, self._BATCH, self._CONCURRENCY)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """Embed multiple documents"""
         if texts is None:
             raise ValueError("Texts list cannot be None")
@@ -91,10 +250,10 @@ class GoogleEmbeddingAdapter(EmbeddingAdapter):
             raise ValueError("Texts must be a list")
         
         if not texts:
-            return []
+            return _no_embeddings()
         
         try:
-            return self.embeddings.embed_documents(texts)
+            return _embed_with_cache(self._cache, self.model_name, self._embed_batches, texts)
         except Exception as e:
             raise EmbeddingGenerationError(f"Failed to generate embeddings for documents: {e}")
     
@@ -119,7 +278,11 @@ class GoogleEmbeddingAdapter(EmbeddingAdapter):
 class HuggingFaceEmbeddingAdapter(EmbeddingAdapter):
     """Adapter for HuggingFace Inference embeddings"""
     
-    def __init__(self, model_name: str, api_key: Optional[str] = None):
+    # HF Inference endpoints throttle large payloads
+    _BATCH = 32
+    _CONCURRENCY = 8
+    
+    def __init__(self, model_name: str, api_key: Optional[str] = None, cache_path: Optional[str] = None):
         if not model_name or not model_name.strip():
             raise ValueError("Model name cannot be empty")
         
@@ -129,7 +292,10 @@ class HuggingFaceEmbeddingAdapter(EmbeddingAdapter):
         if not self.api_key:
             raise ConfigurationError("HuggingFace API key must be provided via parameter or HF_API_KEY environment variable")
         
+        self._cache = _open_cache(cache_path)
+        
         try:
+            from langchain_huggingface import HuggingFaceEndpointEmbeddings
             self.embeddings = HuggingFaceEndpointEmbeddings(
                 model=model_name,
                 huggingfacehub_api_token=self.api_key
@@ -137,7 +303,10 @@ class HuggingFaceEmbeddingAdapter(EmbeddingAdapter):
         except Exception as e:
             raise ModelLoadError(f"Failed to initialize HuggingFace embeddings model '{model_name}': {e}")
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def _embed_batches(self, texts: List[str]) -> np.ndarray:
+        return _embed_in_batches(self.embeddings.embed_documents, texts, self._BATCH, self._CONCURRENCY)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """Embed multiple documents"""
         if texts is None:
             raise ValueError("Texts list cannot be None")
@@ -146,10 +315,10 @@ class HuggingFaceEmbeddingAdapter(EmbeddingAdapter):
             raise ValueError("Texts must be a list")
         
         if not texts:
-            return []
+            return _no_embeddings()
         
         try:
-            return self.embeddings.embed_documents(texts)
+            return _embed_with_cache(self._cache, self.model_name, self._embed_batches, texts)
         except Exception as e:
             raise EmbeddingGenerationError(f"Failed to generate embeddings for documents: {e}")
     
@@ -170,21 +339,149 @@ class HuggingFaceEmbeddingAdapter(EmbeddingAdapter):
             raise EmbeddingGenerationError(f"Failed to generate embedding for query: {e}")
 
 
+class _QueryBatcher:
+    """Coalesces concurrent single-text queries into one batched encode call"""
+    
+    def __init__(self, encode_fn: Callable[[List[str]], Any], max_batch: int = 64):
+        """
+        Args:
+            encode_fn: Function encoding a list of texts into a list/array of vectors
+            max_batch: Maximum number of queries per encode call
+        """
+        self._encode_fn = encode_fn
+        self._max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker = None
+    
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding, returns a Future resolved with its vector"""
+        future = Future()
+        self._queue.put((text, future))
+        # The worker exits once the queue is empty, a new one is started for the next query
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+        return future
+    
+    def _run(self):
+        while True:
+            # Checked under the lock so a query queued meanwhile either is seen here or starts a new worker
+            with self._lock:
+                if self._queue.empty():
+                    self._worker = None
+                    return
+            
+            # Only queries already waiting are batched, a lone query is encoded right away
+            items = []
+            while len(items) < self._max_batch:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                vectors = self._encode_fn([text for text, _ in items])
+                if len(vectors) != len(items):
+                    raise EmbeddingGenerationError(f"Expected {len(items)} query embeddings, got {len(vectors)}")
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), vector in zip(items, vectors):
+                future.set_result(vector)
+
+
 class LocalEmbeddingAdapter(EmbeddingAdapter):
     """Adapter for HuggingFace embeddings(Local instance)"""
     
-    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+    # Precision name -> torch dtype name
+    _PRECISIONS = {'fp32': 'float32', 'fp16': 'float16', 'bf16': 'bfloat16'}
+    
+    def __init__(self,
+                 model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 quantize: Optional[str] = None,
+                 precision: Optional[str] = None,
+                 cache_path: Optional[str] = None):
+        """
+        Args:
+            model_name: SentenceTransformer model name
+            quantize: "int8" to quantize the model's linear layers for CPU inference,
+                      defaults to the QUANTIZE_LOCAL environment variable
+            precision: "fp32", "fp16" or "bf16" for GPU inference,
+                       defaults to the EMBED_PRECISION environment variable(or fp32)
+            cache_path: sqlite file caching document embeddings across runs,
+                        defaults to the EMBEDDING_CACHE environment variable(no cache if unset)
+        """
         if not model_name or not model_name.strip():
             raise ValueError("Model name cannot be empty")
         
         self.model_name = model_name
+        self.quantize = quantize or os.getenv('QUANTIZE_LOCAL')
+        self.precision = precision or os.getenv('EMBED_PRECISION', 'fp32')
+        
+        if self.quantize and self.quantize != 'int8':
+            raise ConfigurationError(f"Unsupported quantization: {self.quantize}. Supported: int8")
+        
+        if self.precision not in self._PRECISIONS:
+            raise ConfigurationError(f"Unsupported precision: {self.precision}. Supported: fp32, fp16, bf16")
+        
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ModelLoadError(f"Local embeddings require sentence-transformers and torch: {e}")
+        
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self._cache = _open_cache(cache_path)
+        # Quantized and reduced precision models give slightly different vectors, each variant has its own cache entries
+        self._cache_model_name = f"{model_name}:{self.quantize or 'none'}:{self.precision}"
         
         try:
-            self.model = SentenceTransformer(model_name)
+            self.model = SentenceTransformer(model_name, device=self.device)
         except Exception as e:
             raise ModelLoadError(f"Failed to load local embeddings model '{model_name}': {e}")
+        
+        # INT8 kernels are CPU only
+        if self.quantize == 'int8' and self.device == 'cpu':
+            try:
+                torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            except Exception as e:
+                raise ModelLoadError(f"Failed to quantize local embeddings model '{model_name}': {e}")
+        
+        # Half precision + compiled forward pass on GPU
+        if self.device == 'cuda' and self.precision != 'fp32':
+            try:
+                self.model = self.model.to(getattr(torch, self._PRECISIONS[self.precision]))
+                self.model[0].auto_model = torch.compile(self.model[0].auto_model, mode='reduce-overhead')
+            except Exception as e:
+                raise ModelLoadError(f"Failed to prepare {self.precision} model '{model_name}': {e}")
+        
+        self._batcher = _QueryBatcher(self._encode_queries)
+    
+    def _inference_context(self) -> ExitStack:
+        """No-grad inference, autocast to the configured precision on GPU"""
+        import torch
+        
+        stack = ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.device == 'cuda' and self.precision != 'fp32':
+            stack.enter_context(torch.autocast('cuda', dtype=getattr(torch, self._PRECISIONS[self.precision])))
+        return stack
+    
+    def _encode_documents(self, texts: List[str]) -> np.ndarray:
+        with self._inference_context():
+            embeddings = self.model.encode(texts, batch_size=128, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype=np.float32)
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def _encode_queries(self, texts: List[str]):
+        """Encode a batch of queries collected by the query batcher"""
+        with self._inference_context():
+            return self.model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """Embed multiple documents"""
         if texts is None:
             raise ValueError("Texts list cannot be None")
@@ -193,11 +490,10 @@ class LocalEmbeddingAdapter(EmbeddingAdapter):
             raise ValueError("Texts must be a list")
         
         if not texts:
-            return []
+            return _no_embeddings(self.model.get_sentence_embedding_dimension())
         
         try:
-            embeddings = self.model.encode(texts, convert_to_tensor=False, normalize_embeddings=True)
-            return embeddings.tolist()
+            return _embed_with_cache(self._cache, self._cache_model_name, self._encode_documents, texts)
         except Exception as e:
             raise EmbeddingGenerationError(f"Failed to generate embeddings for documents: {e}")
     
@@ -213,8 +509,8 @@ class LocalEmbeddingAdapter(EmbeddingAdapter):
             raise ValueError("Text cannot be empty")
         
         try:
-            embedding = self.model.encode([text], convert_to_tensor=False, normalize_embeddings=True)
-            return embedding[0].tolist()
+            # Concurrent queries are encoded together in one model call
+            return self._batcher.submit(text).result().tolist()
         except Exception as e:
             raise EmbeddingGenerationError(f"Failed to generate embedding for query: {e}")
     
@@ -227,6 +523,13 @@ class LocalEmbeddingAdapter(EmbeddingAdapter):
 class EmbeddingAdapterFactory:
     """Factory class for creating embedding adapters"""
     
+    # Provider -> adapter class(each adapter imports its SDK only when constructed)
+    _REGISTRY = {
+        'google': GoogleEmbeddingAdapter,
+        'huggingface': HuggingFaceEmbeddingAdapter,
+        'local': LocalEmbeddingAdapter,
+    }
+    
     @staticmethod
     def create_adapter(
         model_name: str,
@@ -257,16 +560,16 @@ class EmbeddingAdapterFactory:
         
         provider = provider.lower().strip()
         
+        if provider not in EmbeddingAdapterFactory._REGISTRY:
+            supported = ', '.join(EmbeddingAdapterFactory._REGISTRY)
+            raise ValueError(f"Unknown provider: {provider}. Supported providers: {supported}")
+        
         # Create adapter based on provider
         try:
-            if provider == "google":
-                return GoogleEmbeddingAdapter(model_name, api_key)
-            elif provider == "huggingface":
-                return HuggingFaceEmbeddingAdapter(model_name, api_key)
-            elif provider == "local":
-                return LocalEmbeddingAdapter(model_name)
-            else:
-                raise ValueError(f"Unknown provider: {provider}. Supported providers: google, huggingface, local")
+            adapter_class = EmbeddingAdapterFactory._REGISTRY[provider]
+            if provider == "local":
+                return adapter_class(model_name)
+            return adapter_class(model_name, api_key)
         except Exception as e:
             if isinstance(e, (ValueError, ConfigurationError, ModelLoadError)):
                 raise
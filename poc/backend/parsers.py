@@ -1,7 +1,13 @@
 import re
 import json
+import hashlib
+import itertools
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 
 class ParserError(Exception):
     """Base exception for parser operations"""
@@ -34,6 +40,34 @@ stop_tags = {
     LineType.SECTION: [LineType.SECTION, LineType.SIGN, LineType.CHAPTER, LineType.PART, LineType.ADDENDUM, LineType.METADATA],
     LineType.METADATA: [LineType.SECTION, LineType.SIGN, LineType.CHAPTER, LineType.PART, LineType.ADDENDUM]
 }
+
+#Compiled once, matched for every line of every document
+_SECTION_RE = re.compile(r"^\s*@\s*([\d\w־\-\.]+)\.\s*(.*)$")   # @ 1. **
+_LAW_NAME_RE = re.compile(r"<שם>\s*(.+)")
+_METADATA_PREFIXES = ('<שם>', '<מקור>', '<מבוא>', '<חתימות>', '<פרסום>', '<שם קודם>', '<מאגר')
+_HEADING_TYPES = (LineType.ADDENDUM, LineType.PART, LineType.CHAPTER, LineType.SIGN)
+#Finds every heading keyword of a title in one scan, _HEADING_TYPES order decides between several
+_HEADING_KEYWORD_RE = re.compile('|'.join(t.value for t in _HEADING_TYPES))
+#Characters trimmed around heading titles: = חלק א' =, (תוספת), {...}
+_HEADING_TRIM = ' =(){}'
+
+#Classifies a line in one match, the matching group name is the line kind:
+#head - = ** = (its type is found by keyword), meta - <שם>/<מקור>/..., sec - @ 1. **
+_LINE_CLASSIFIER = re.compile(
+    r"(?P<head>=.)"
+    r"|\s*(?:(?P<meta>" + '|'.join(map(re.escape, _METADATA_PREFIXES)) + r")"
+    r"|(?P<sec>@\s*[\d\w־\-\.]+\.))"
+)
+
+#stop_tags as bitmasks: one bit per line type, a line stops a chunk if its bit is set in the mask
+_LINE_TYPE_BITS = {t: 1 << i for i, t in enumerate(LineType)}
+_STOP_MASKS = {k: sum(_LINE_TYPE_BITS[t] for t in v) for k, v in stop_tags.items()}
+
+#Parsed blocks of recently parsed documents, keyed by the document's digest(least recently used first)
+_PARSE_CACHE_SIZE = 256
+_parse_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], ...]]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
 def get_line_type(line: str) -> LineType:
     """
     Determines the type of a line in a legal document.
@@ -58,26 +92,23 @@ def get_line_type(line: str) -> LineType:
         return LineType.REGULAR
     
     try:
-        # is heading? (= ** =)
-        heading_regex = re.compile(r"^(=+)\s*(.+?)\s*(=+)?$")
-        m_head = heading_regex.match(line)
+        m_line = _LINE_CLASSIFIER.match(line)
+        if m_line is None:
+            return LineType.REGULAR
         
-        if m_head:
-            #determine the heading
-            title = m_head.group(2).strip(' =()\{\}')
-            headings = [LineType.ADDENDUM, LineType.PART, LineType.CHAPTER, LineType.SIGN]
-            for t in headings:
-                if t.value in title:
+        kind = m_line.lastgroup
+        # is heading? (= ** =)
+        if kind == 'head':
+            #determine the heading(keywords never overlap the stripped '=' and brackets)
+            keywords = set(_HEADING_KEYWORD_RE.findall(line.strip(_HEADING_TRIM)))
+            for t in _HEADING_TYPES:
+                if t.value in keywords:
                     return t
-        
         #is metadata?
-        if line.strip().startswith(('<שם>', '<מקור>', '<מבוא>', '<חתימות>', '<פרסום>', '<שם קודם>', '<מאגר')):
+        elif kind == 'meta':
             return LineType.METADATA
-        
         #is section?
-        section_regex = re.compile(r"^\s*@\s*([\d\w־\-\.]+)\.\s*(.*)$")
-        m_section = section_regex.match(line)
-        if m_section:
+        elif kind == 'sec':
             return LineType.SECTION
         #Default
         return LineType.REGULAR
@@ -111,8 +142,7 @@ def get_section_properties(line: str) -> Dict[str, str]:
         raise ValueError("Line cannot be empty")
     
     try:
-        section_regex = re.compile(r"^\s*@\s*([\d\w־\-\.]+)\.\s*(.*)$")
-        m_section = section_regex.match(line)
+        m_section = _SECTION_RE.match(line)
         
         if not m_section:
             raise ValueError(f"This is not a valid section line: '{line}'")
@@ -129,6 +159,65 @@ def get_section_properties(line: str) -> Dict[str, str]:
             raise
         raise SectionParsingError(f"Unexpected error while parsing section: {e}")
 
+#Same line boundaries as str.splitlines
+_LINE_BREAKS = r"\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_BREAK_RE = re.compile(r"\r\n|[" + _LINE_BREAKS + r"]")
+
+#A line starting with a prefix _LINE_CLASSIFIER may classify as non regular
+#(whitespace and '.' of the prefixes kept inside the line), the whole line is the 'line' group
+_ANCHOR_LINE = (
+    r"(?P<line>(?:=[^" + _LINE_BREAKS + r"]"
+    r"|[^\S" + _LINE_BREAKS + r"]*(?:" + '|'.join(map(re.escape, _METADATA_PREFIXES)) +
+    r"|@[^\S" + _LINE_BREAKS + r"]*[\d\w־\-\.]+\.))"
+    r"[^" + _LINE_BREAKS + r"]*)"
+)
+_FIRST_ANCHOR_RE = re.compile(_ANCHOR_LINE)
+#Finds such lines at document scope(after the first line), leading with the line break
+#lets the regex engine skip to candidate positions instead of trying every character
+_ANCHOR_RE = re.compile(r"[" + _LINE_BREAKS + r"]" + _ANCHOR_LINE)
+
+def _line_index(document: str, pos: int) -> int:
+    """Index of the line containing document[pos], for error messages"""
+    return len(_LINE_BREAK_RE.findall(document, 0, pos))
+
+def _find_anchors(document: str) -> Iterator[Tuple[int, int, str, LineType, int]]:
+    """
+    Locates the heading, section and metadata lines of a document, the lines between
+    them are never classified one by one.
+    
+    Yields:
+        (line start, next line start, line, line type, line type's stop bit) for each such line
+        
+    Raises:
+        ParserError: If a line can't be classified
+    """
+    first = _FIRST_ANCHOR_RE.match(document)
+    for m in itertools.chain([first] if first else [], _ANCHOR_RE.finditer(document)):
+        line = m.group('line')
+        start, end = m.span('line')
+        #the line break ending the line(\r\n is one break)
+        next_start = min(end + 1 + (document[end:end + 2] == '\r\n'), len(document))
+        try:
+            line_type = get_line_type(line)
+        except Exception as e:
+            raise ParserError(f"Unexpected error parsing line {_line_index(document, start)}: {e}")
+        # e.g. a heading without a keyword
+        if line_type != LineType.REGULAR:
+            yield start, next_start, line, line_type, _LINE_TYPE_BITS[line_type]
+
+def _read_chunk(anchors: Iterator[Tuple[int, int, str, LineType, int]], stop_mask: int):
+    """
+    Skips the following anchors until one whose type is in stop_mask,
+    the chunk spans every line before it.
+    
+    Returns:
+        The stop anchor, or None if the document ended
+    """
+    for anchor in anchors:
+        if anchor[4] & stop_mask:
+            return anchor
+    return None
+
 class Parser:
     @staticmethod
     def parse(document: str) -> List[Dict[str, Any]]:
@@ -191,6 +280,7 @@ class WikiSectionParser(Parser):
     def parse(document: str) -> List[Dict[str, Any]]:
         """
         Parse a Wiki legal document into structured sections.
+        The blocks of the last _PARSE_CACHE_SIZE distinct documents are cached.
         
         Args:
             document: The document text to parse
@@ -198,6 +288,47 @@ class WikiSectionParser(Parser):
         Returns:
             List of parsed legal sections with metadata
             
+        Raises:
+            ValueError: If document is None or empty
+            InvalidDocumentError: If document structure is invalid
+            ParserError: If parsing fails unexpectedly
+        """
+        if not isinstance(document, str):
+            return list(WikiSectionParser.iter_parse(document))
+        
+        # Identical documents(re-indexing, retries) are parsed once, each caller gets its own block dicts
+        key = hashlib.blake2b(document.encode('utf-8'), digest_size=16).digest()
+        with _parse_cache_lock:
+            blocks = _parse_cache.get(key)
+            if blocks is not None:
+                _parse_cache.move_to_end(key)
+        if blocks is None:
+            blocks = tuple(WikiSectionParser.iter_parse(document))
+            with _parse_cache_lock:
+                _parse_cache[key] = blocks
+                if len(_parse_cache) > _PARSE_CACHE_SIZE:
+                    _parse_cache.popitem(last=False)
+        return [dict(block) for block in blocks]
+
+    @staticmethod
+    def clear_parse_cache():
+        """Forget the documents cached by parse"""
+        with _parse_cache_lock:
+            _parse_cache.clear()
+
+    @staticmethod
+    def iter_parse(document: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a Wiki legal document into structured sections, yielding each
+        section as soon as it is complete so callers can process them in batches.
+        Errors are raised while iterating, sections yielded before an error stay valid.
+        
+        Args:
+            document: The document text to parse
+            
+        Yields:
+            Parsed legal sections with metadata
+            
         Raises:
             ValueError: If document is None or empty
             InvalidDocumentError: If document structure is invalid
@@ -213,129 +344,121 @@ class WikiSectionParser(Parser):
             raise ValueError("Document cannot be empty")
         
         try:
-            result = []
+            blocks = 0
 
             # extract <name> as law name
             try:
-                law_match = re.search(r"<שם>\s*(.+)", document)
+                law_match = _LAW_NAME_RE.search(document)
                 law_name = law_match.group(1).strip() if law_match else None
             except Exception as e:
                 raise InvalidDocumentError(f"Failed to extract law name: {e}")
 
-            # Normalize lines
-            lines = document.splitlines()
+            # Only heading, section and metadata lines are visited, the lines between them are sliced
+            anchors = _find_anchors(document)
+            pushback = None  # stop anchor read ahead by a chunking loop, handled next
+            pos = 0  # start of the first line not in a block yet
 
             current_part = None  # חלק
             current_chapter = None   # פרק
             current_sign = None   # סימן
             current_section = None
 
-            #Iterating the lines and divide + concat to chunks
-            lineIdx = 0
-            while lineIdx < len(lines):
-                try:
-                    chunk = ''
-                    line = lines[lineIdx]
-                    line_type = get_line_type(line)
+            def pack(chunk: str) -> Dict[str, Any]:
+                return {
+                    'law_name': law_name,
+                    'part' : current_part,
+                    'chapter' : current_chapter,
+                    'sign' : current_sign,
+                    'section' : current_section,
+                    'text': chunk
+                }
+
+            def read_chunk(first: str, stop_mask: int) -> str:
+                #The chunk runs from its first line up to the stop anchor, as one line
+                nonlocal pushback, pos
+                pushback = _read_chunk(anchors, stop_mask)
+                end = pushback[0] if pushback else len(document)
+                chunk = first + _LINE_BREAK_RE.sub('', document[pos:end]) if end > pos else first
+                pos = end
+                return chunk
+
+            #Iterating the anchors and divide + concat to chunks
+            while True:
+                anchor, pushback = pushback or next(anchors, None), None
+                #Regular lines that no chunk took, a block each(with filtering of empty blocks)
+                gap_end = anchor[0] if anchor else len(document)
+                if gap_end > pos:
+                    for line in _LINE_BREAK_RE.split(document[pos:gap_end]):
+                        if line.strip():
+                            blocks += 1
+                            yield pack(line)
+                if anchor is None:
+                    break
+                start, pos, line, line_type, _ = anchor
+                chunk = ''
 
-                    #Metadata
-                    if(line_type == LineType.METADATA):
-                        #Pack all current metadata
-                        current_part = 'metadata'
-                        current_sign = current_chapter = current_section =  None
-                        #building the chunk
-                        chunk = line
-                        #Next line
-                        lineIdx+=1
-                        while(lineIdx < len(lines) and get_line_type(lines[lineIdx]) not in stop_tags[LineType.METADATA]):
-                            chunk+=lines[lineIdx]
-                            lineIdx+=1
-                    #ADDENDUM
-                    elif(line_type == LineType.ADDENDUM):
-                        #Pack all current ADDENDUM
-                        current_part = line.strip(' =()\{\}')
-                        current_sign = current_chapter = current_section = None
-                        #building the chunk - first line
-                        chunk = line
-                        #Next line
-                        lineIdx+=1
-                        while(lineIdx < len(lines) and get_line_type(lines[lineIdx]) not in stop_tags[LineType.ADDENDUM]):
-                            chunk+=lines[lineIdx]
-                            #Next line
-                            lineIdx+=1
-                    #PART, CHAPTER, SIGN
-                    elif(line_type == LineType.PART):
-                        current_part = line.strip(' =()\{\}')
-                        current_chapter = current_sign = current_section = None
-                        lineIdx+=1
-                    elif(line_type == LineType.CHAPTER):
-                        current_chapter = line.strip(' =()\{\}')
-                        current_sign = current_section = None
-                        if current_part == 'metadata': current_part = None
-                        lineIdx+=1
-                    elif(line_type == LineType.SIGN):
-                        current_sign = line.strip(' =()\{\}')
-                        current_section = None
-                        if current_part == 'metadata': current_part = None
-                        lineIdx+=1
-                    #SECTION
-                    elif(line_type == LineType.SECTION):
-                        #Determine section type
-                        try:
-                            prop = get_section_properties(line)
-                        except Exception as e:
-                            raise SectionParsingError(f"Failed to parse section at line {lineIdx}: {e}")
-                        
-                        if current_part == 'metadata': current_part = None
-                        current_section = prop['section_num']
-                        chunk = prop['section_text']
-                        #Next line
-                        lineIdx+=1
-                        while(lineIdx < len(lines) and get_line_type(lines[lineIdx]) not in stop_tags[LineType.SECTION]):
-                            chunk+=lines[lineIdx]
-                            lineIdx+=1
-                    else: #regular line
-                        chunk = line
-                        lineIdx+=1
+                #Metadata
+                if(line_type == LineType.METADATA):
+                    #Pack all current metadata
+                    current_part = 'metadata'
+                    current_sign = current_chapter = current_section =  None
+                    #building the chunk
+                    chunk = read_chunk(line, _STOP_MASKS[LineType.METADATA])
+                #ADDENDUM
+                elif(line_type == LineType.ADDENDUM):
+                    #Pack all current ADDENDUM
+                    current_part = line.strip(_HEADING_TRIM)
+                    current_sign = current_chapter = current_section = None
+                    #building the chunk - first line
+                    chunk = read_chunk(line, _STOP_MASKS[LineType.ADDENDUM])
+                #PART, CHAPTER, SIGN
+                elif(line_type == LineType.PART):
+                    current_part = line.strip(_HEADING_TRIM)
+                    current_chapter = current_sign = current_section = None
+                elif(line_type == LineType.CHAPTER):
+                    current_chapter = line.strip(_HEADING_TRIM)
+                    current_sign = current_section = None
+                    if current_part == 'metadata': current_part = None
+                elif(line_type == LineType.SIGN):
+                    current_sign = line.strip(_HEADING_TRIM)
+                    current_section = None
+                    if current_part == 'metadata': current_part = None
+                #SECTION
+                elif(line_type == LineType.SECTION):
+                    #Determine section type
+                    try:
+                        prop = get_section_properties(line)
+                    except Exception as e:
+                        raise SectionParsingError(f"Failed to parse section at line {_line_index(document, start)}: {e}")
                     
-                    #Pack
-                    block = {
-                        'law_name': law_name,
-                        'part' : current_part,
-                        'chapter' : current_chapter,
-                        'sign' : current_sign,
-                        'section' : current_section,
-                        'text': chunk
-                    }
-                    #Add to results(with filtering of empty blocks)
-                    if chunk and chunk.strip():
-                        result.append(block)
-                        
-                except Exception as e:
-                    if isinstance(e, (ValueError, SectionParsingError, InvalidDocumentError)):
-                        raise
-                    raise ParserError(f"Unexpected error parsing line {lineIdx}: {e}")
+                    if current_part == 'metadata': current_part = None
+                    current_section = prop['section_num']
+                    chunk = read_chunk(prop['section_text'], _STOP_MASKS[LineType.SECTION])
+                
+                #Yield(with filtering of empty blocks)
+                if chunk and chunk.strip():
+                    blocks += 1
+                    yield pack(chunk)
             
-            if not result:
+            if not blocks:
                 raise InvalidDocumentError("No valid content blocks found in document")
-            
-            #return
-            return result
         
         except Exception as e:
             if isinstance(e, (ValueError, InvalidDocumentError, SectionParsingError, ParserError)):
                 raise
             raise ParserError(f"Unexpected error during document parsing: {e}")
     @staticmethod
-    def parse_many(documents: List[str]) -> List[List[Dict[str, Any]]]:
+    def parse_many(documents: List[str], workers: Optional[int] = 1) -> List[List[Dict[str, Any]]]:
         """
-        Parse multiple Wiki legal documents.
+        Parse multiple Wiki legal documents, optionally in parallel worker processes.
         
         Args:
             documents: List of document strings to parse
+            workers: Number of worker processes(None for the number of CPUs),
+                     defaults to 1, parsing in the calling process
             
         Returns:
-            List of parsing results for each document
+            List of parsing results for each successfully parsed document, in document order
             
         Raises:
             ValueError: If documents is None or not a list
@@ -350,16 +473,29 @@ class WikiSectionParser(Parser):
         if not documents:
             return []
         
-        results = []
+        parsed = [None] * len(documents)
         failed_docs = []
         
-        for i, document in enumerate(documents):
-            try:
-                res = WikiSectionParser.parse(document)
-                results.append(res)
-            except Exception as e:
-                failed_docs.append({'index': i, 'error': str(e)})
-                continue
+        # Starting worker processes costs more than parsing a couple of documents
+        if workers == 1 or len(documents) <= 2:
+            for i, document in enumerate(documents):
+                try:
+                    parsed[i] = WikiSectionParser.parse(document)
+                except Exception as e:
+                    failed_docs.append({'index': i, 'error': str(e)})
+        else:
+            # Spawned rather than forked, forking a process that runs threads(the API server, the pipeline) is unsafe
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(WikiSectionParser.parse, document): i for i, document in enumerate(documents)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        parsed[i] = future.result()
+                    except Exception as e:
+                        failed_docs.append({'index': i, 'error': str(e)})
+            failed_docs.sort(key=lambda f: f['index'])
+        
+        results = [res for res in parsed if res is not None]
         
         if not results and failed_docs:
             raise ParserError(f"Failed to parse any documents. Sample errors: {failed_docs[:3]}")
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full, Empty
+import threading
+from typing import List, Dict, Any
+
+from fetchers import WikiFetcher
+from parsers import WikiSectionParser
+from storers import PineconeStorer
+
+# Marks the end of a stage's output
+_DONE = None
+
+def _put(q: Queue, item: Any, stop: threading.Event) -> bool:
+    """Blocking put that gives up once stop is set, returns whether the item was queued"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+def _get(q: Queue, stop: threading.Event) -> Any:
+    """Blocking get that returns _DONE once stop is set"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except Empty:
+            continue
+    return _DONE
+
+def run_pipeline(storer: PineconeStorer,
+                 law_names: List[str],
+                 fetch_workers: int = 16,
+                 batch_size: int = 100,
+                 timeout: int = 30,
+                 retries: int = 3) -> Dict[str, Any]:
+    """
+    Fetch, parse and store laws as overlapping stages connected by bounded queues,
+    so chunks of early laws are embedded and stored while later laws are still downloading.
+
+    Stages:
+        fetch: fetch_workers threads calling WikiFetcher.fetch_one
+        parse: one thread calling WikiSectionParser.iter_parse(parsing is CPU bound,
+               more threads would only contend for the GIL)
+        store: the calling thread, storing chunks in batches of batch_size
+
+    Args:
+        storer: Storer the chunks are embedded with and stored into
+        law_names: Names of the laws to fetch
+        fetch_workers: Number of concurrent fetch requests
+        batch_size: Number of chunks embedded and stored per call
+        timeout: Fetch request timeout in seconds
+        retries: Number of fetch retry attempts
+
+    Returns:
+        Summary dictionary with 'laws'(number of laws stored), 'chunks'(number of chunks stored)
+        and 'failed_laws'(law name and error for each law failed to fetch or parse)
+
+    Raises:
+        ValueError: If batch_size or fetch_workers is not positive
+        StorageError / EmbeddingError: If storing a batch fails, the other stages are stopped
+        Exception: The error a fetch or parse stage failed with, raised once the chunks it already produced are stored
+    """
+    if batch_size <= 0:
+        raise ValueError("Batch size must be positive")
+
+    if fetch_workers <= 0:
+        raise ValueError("Number of fetch workers must be positive")
+
+    fetch_q = Queue(maxsize=32)
+    chunk_q = Queue(maxsize=256)
+    stop = threading.Event()
+    failed_laws = []
+    # Fetched names of the laws with chunks queued, the chunks' law_name may be missing or shared
+    parsed_laws = set()
+
+    def fetch_law(name: str):
+        if stop.is_set():
+            return
+        try:
+            content = WikiFetcher.fetch_one(name, timeout=timeout, retries=retries)
+        except Exception as e:
+            failed_laws.append({'law_name': name, 'error': str(e)})
+            return
+        _put(fetch_q, (name, content), stop)
+
+    def fetch_stage():
+        with ThreadPoolExecutor(max_workers=fetch_workers) as ex:
+            list(ex.map(fetch_law, law_names))
+
+    def parse_stage():
+        while (item := _get(fetch_q, stop)) is not _DONE:
+            name, content = item
+            if content is None:
+                failed_laws.append({'law_name': name, 'error': "No content found"})
+                continue
+            # Chunks are queued as they are parsed, a law failing midway keeps its earlier chunks
+            try:
+                for chunk in WikiSectionParser.iter_parse(content):
+                    if not _put(chunk_q, chunk, stop):
+                        return
+                    parsed_laws.add(name)
+            except Exception as e:
+                failed_laws.append({'law_name': name, 'error': str(e)})
+
+    def run_stage(stage_fn, out_q: Queue):
+        # The end of the stage's output is marked even if the stage fails, so the next stage never waits forever
+        try:
+            stage_fn()
+        except Exception as e:
+            stage_errors.append(e)
+        finally:
+            _put(out_q, _DONE, stop)
+
+    stage_errors = []
+    stages = [threading.Thread(target=run_stage, args=(fetch_stage, fetch_q), name="pipeline-fetch", daemon=True),
+              threading.Thread(target=run_stage, args=(parse_stage, chunk_q), name="pipeline-parse", daemon=True)]
+    for stage in stages:
+        stage.start()
+
+    stored_chunks = 0
+    batch = []
+    try:
+        while True:
+            chunk = chunk_q.get()
+            if chunk is not _DONE:
+                batch.append(chunk)
+            if batch and (len(batch) >= batch_size or chunk is _DONE):
+                storer.store(batch)
+                stored_chunks += len(batch)
+                batch = []
+            if chunk is _DONE:
+                break
+    finally:
+        # On failure, unblock and stop the fetch and parse stages
+        stop.set()
+        for stage in stages:
+            stage.join()
+
+    if stage_errors:
+        raise stage_errors[0]
+
+    return {
+        'laws': len(parsed_laws),
+        'chunks': stored_chunks,
+        'failed_laws': failed_laws
+    }
@@ -1,34 +1,64 @@
+import asyncio
 import os
+import threading
+from functools import lru_cache
+from typing import List, Optional, AsyncIterator
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_pinecone import PineconeVectorStore
-from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
 
-class LLMPipeline:
-    def __init__(self):
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001", 
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-            )
+#SDK clients are created once per process and shared by every LLMPipeline
+_init_lock = threading.Lock()
 
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-pro", 
-            google_api_key=os.getenv('GOOGLE_API_KEY'), 
-            temperature=0
-            )
+@lru_cache(maxsize=1)
+def _get_embeddings() -> GoogleGenerativeAIEmbeddings:
+    return GoogleGenerativeAIEmbeddings(
+        model="models/embedding-001", 
+        google_api_key=os.getenv('GOOGLE_API_KEY')
+        )
 
-        #TODO: put it on .env
-        index_name = "law-agent"
-        vectorstore = PineconeVectorStore(
-            index_name=index_name, 
-            embedding=embeddings
-            )
+@lru_cache(maxsize=1)
+def _get_llm() -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-pro", 
+        google_api_key=os.getenv('GOOGLE_API_KEY'), 
+        temperature=0
+        )
+
+@lru_cache(maxsize=1)
+def _get_vectorstore() -> PineconeVectorStore:
+    #TODO: put it on .env
+    index_name = "law-agent"
+    return PineconeVectorStore(
+        index_name=index_name, 
+        embedding=_get_embeddings()
+        )
+
+class LLMPipeline:
+    def __init__(self, k: Optional[int] = None):
+        """
+        Args:
+            k: Number of documents passed to the LLM per question
+               (defaults to the RETRIEVER_K environment variable, or 8)
+        """
+        #The lock keeps concurrent first constructions from building the clients twice
+        with _init_lock:
+            self.llm = _get_llm()
+            vectorstore = _get_vectorstore()
+
+        if k is None:
+            k = int(os.getenv("RETRIEVER_K", "8"))
 
         # RAG pipeline
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 30})
+        # Fetch 30 candidates with their vectors, rerank them locally(MMR: relevance to the
+        # question, penalizing near-duplicates) and pass only the top k to the LLM
+        self.retriever = vectorstore.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k": k, "fetch_k": max(30, k), "lambda_mult": 0.7}
+            )
 
         prompt_template = """Use the following context to answer the question.
         If you don't know, say you don't know.
@@ -46,17 +76,13 @@ class LLMPipeline:
         Answer:"""
 
 
-        prompt = PromptTemplate(template=prompt_template,
-                                input_variables=["context", "question"])
+        self.prompt_template = PromptTemplate(template=prompt_template,
+                                              input_variables=["context", "question"])
 
-
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=llm,
-            retriever=retriever,
-            chain_type="stuff",
-            chain_type_kwargs={"prompt": prompt},
-            return_source_documents=True
-        )
+    def _format_prompt(self, question: str, docs) -> str:
+        #The retrieved documents are "stuffed" into the prompt's context
+        context = "\n\n".join(doc.page_content for doc in docs)
+        return self.prompt_template.format(context=context, question=question)
 
     def prompt(self, question: str):
         """
@@ -68,11 +94,96 @@ class LLMPipeline:
         Returns:
             The LLM's answer
         """
-        response = self.qa_chain.invoke({'query': question})
+        docs = self.retriever.invoke(question)
+        response = self.llm.invoke(self._format_prompt(question, docs))
         
         #Extracting the answer from the response
         #TODO: maybe do it on the fastApi app
-        answer = response.get("result")
+        return self._to_answer(response.content)
+
+    async def prompt_stream(self, question: str, min_chars: int = 32, max_delay: float = 0.05) -> AsyncIterator[str]:
+        """
+        Gets a question and streams the answer
+        (Legal Opinion) from LLM as it is generated.
+        The LLM's few-token chunks are coalesced, a part is yielded once it has
+        min_chars characters or its first chunk waited max_delay seconds.
+        
+        Args:
+            question: A question for Chatbot
+            min_chars: Smallest part yielded before max_delay passes
+            max_delay: Seconds a buffered chunk may wait for more chunks
+        Yields:
+            Consecutive parts of the LLM's answer
+        """
+        docs = await self.retriever.ainvoke(question)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        async def read_llm():
+            try:
+                async for chunk in self.llm.astream(self._format_prompt(question, docs)):
+                    if chunk.content:
+                        await chunks.put(self._to_answer(chunk.content))
+            finally:
+                await chunks.put(None)
+
+        reader = asyncio.create_task(read_llm())
+        try:
+            buffer, size, deadline = [], 0, None
+            while True:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                try:
+                    chunk = await asyncio.wait_for(chunks.get(), timeout)
+                except asyncio.TimeoutError:
+                    chunk = ''
+                if chunk:
+                    buffer.append(chunk)
+                    size += len(chunk)
+                    deadline = deadline or loop.time() + max_delay
+                # Flush a big enough part, a part waiting too long, or the end of the answer
+                if buffer and (chunk is None or size >= min_chars or loop.time() >= deadline):
+                    yield ''.join(buffer)
+                    buffer, size, deadline = [], 0, None
+                if chunk is None:
+                    break
+            #Raises the LLM's error, if it failed
+            await reader
+        finally:
+            reader.cancel()
+
+    async def answer(self, question: str) -> str:
+        """
+        Gets a question and returns the whole streamed answer
+        (Legal Opinion), for async callers that don't stream.
+        """
+        return ''.join([part async for part in self.prompt_stream(question)])
+
+    async def prompt_many(self, questions: List[str], retrieval_timeout: float = 5.0) -> List[str]:
+        """
+        Gets several questions and returns their answers
+        (Legal Opinions), retrieving context for all questions
+        concurrently before querying the LLM concurrently.
+        
+        Args:
+            questions: Questions for Chatbot
+            retrieval_timeout: Seconds to wait for each retriever query
+        Returns:
+            The LLM's answers, in the same order as questions
+        Raises:
+            asyncio.TimeoutError: If a retriever query takes longer than retrieval_timeout
+        """
+        docs_list = await asyncio.gather(
+            *(asyncio.wait_for(self.retriever.ainvoke(q), timeout=retrieval_timeout) for q in questions)
+        )
+        
+        #Same prompt as prompt(), on the already retrieved documents
+        responses = await asyncio.gather(
+            *(self.llm.ainvoke(self._format_prompt(q, docs)) for q, docs in zip(questions, docs_list))
+        )
+        return [self._to_answer(response.content) for response in responses]
+
+    @staticmethod
+    def _to_answer(answer) -> str:
         if not isinstance(answer, str):
             answer = str(answer)
         return answer
@@ -16,7 +16,7 @@ rest_api_dir = os.path.dirname(os.path.dirname(__file__))
 sys.path.insert(0, rest_api_dir)
 
 from models.chat_models import ChatRequest, ChatResponse, ErrorResponse
-from dependencies.config import settings
+from dependencies.config import get_settings
 from llm_pipeline import LLMPipeline
 
 # Configure logging
@@ -68,8 +68,8 @@ llm_pipeline: LLMPipeline = LLMPipeline()
 
 # Initialize FastAPI app
 app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
+    title=get_settings().app_name,
+    version=get_settings().app_version,
     description="API for Israeli legal consultation using RAG and LLM",
     # lifespan=lifespan
 )
@@ -130,6 +130,7 @@ async def general_exception_handler(request, exc: Exception):
 @app.get("/")
 async def root():
     """Root endpoint"""
+    settings = get_settings()
     return {
         "message": f"Welcome to {settings.app_name}",
         "version": settings.app_version,
@@ -213,6 +214,7 @@ async def ask_legal_question(
 @app.get("/api/v1/status")
 async def get_status():
     """Get API status and configuration"""
+    settings = get_settings()
     try:
         pipeline = get_llm_pipeline()
         return {
@@ -243,6 +245,6 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug,
+        reload=get_settings().debug,
         log_level="info"
     )
\ No newline at end of file
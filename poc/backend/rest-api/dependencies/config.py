@@ -1,10 +1,8 @@
-import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 from dotenv import load_dotenv, find_dotenv
 
-load_dotenv(find_dotenv())
-
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
@@ -14,11 +12,11 @@ class Settings(BaseSettings):
     debug: bool = False
     
     # Google Gemini Configuration
-    google_api_key: str = os.getenv("GOOGLE_API_KEY", "")
+    google_api_key: str = ""  # GOOGLE_API_KEY
     gemini_model: str = "gemini-1.5-flash"
     
     # Pinecone Configuration
-    pinecone_api_key: str = os.getenv("PINECONE_API_KEY", "")
+    pinecone_api_key: str = ""  # PINECONE_API_KEY
     pinecone_index_name: str = "law-agent"
     pinecone_dimension: int = 768
     
@@ -38,5 +36,8 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings instance, created(and .env loaded) on first use"""
+    load_dotenv(find_dotenv())
+    return Settings()
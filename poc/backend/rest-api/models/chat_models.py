@@ -1,6 +1,20 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import List, Optional
+from dataclasses import dataclass
 from datetime import datetime
+import time
+
+class TimestampedModel(BaseModel):
+    """Base model stamped with its creation time, kept as an int and formatted only when serialized"""
+    # Response models are built by the server, not parsed from input, so assignments are not revalidated
+    model_config = ConfigDict(validate_assignment=False, extra='ignore')
+    
+    timestamp_ns: int = Field(default_factory=time.time_ns, exclude=True, description="Creation time in nanoseconds since the epoch")
+    
+    @computed_field(description="Creation time(ISO 8601, local time)")
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
 
 class ChatRequest(BaseModel):
     """Model for chat request"""
@@ -19,24 +33,23 @@ class ChatRequest(BaseModel):
 #     text_excerpt: str = Field(..., description="Relevant text excerpt from the law")
 #     relevance_score: Optional[float] = Field(None, description="Relevance score from vector search")
 
-class ChatResponse(BaseModel):
+class ChatResponse(TimestampedModel):
     """Model for chat response"""
     answer: str = Field(..., description="Generated legal opinion/answer")
     # citations: List[Citation] = Field(default_factory=list, description="List of legal citations supporting the answer")
     chat_id: str = Field(..., description="Chat session ID")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Response timestamp")
     processing_time_seconds: Optional[float] = Field(None, description="Time taken to generate response")
 
-class StreamingChatResponse(BaseModel):
-    """Model for streaming chat response chunk"""
-    content: str = Field(..., description="Content chunk")
-    is_final: bool = Field(False, description="Whether this is the final chunk")
-    # citations: Optional[List[Citation]] = Field(None, description="Citations (only in final chunk)")
-    chat_id: str = Field(..., description="Chat session ID")
+@dataclass(slots=True)
+class StreamingChatResponse:
+    """Streaming chat response chunk, a plain dataclass since one is created per streamed chunk"""
+    content: str  # Content chunk
+    chat_id: str  # Chat session ID
+    is_final: bool = False  # Whether this is the final chunk
+    # citations: Optional[List[Citation]] = None  # Citations (only in final chunk)
 
-class ErrorResponse(BaseModel):
+class ErrorResponse(TimestampedModel):
     """Model for error responses"""
     error: str = Field(..., description="Error message")
     error_code: str = Field(..., description="Error code")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Error timestamp")
     chat_id: Optional[str] = Field(None, description="Chat session ID if applicable")
\ No newline at end of file
@@ -1,8 +1,21 @@
 
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+from pinecone.exceptions import NotFoundException
+# The gRPC client(pinecone[grpc]) sends vectors as packed protobuf instead of JSON
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+    _GRPC = True
+except ImportError:
+    from pinecone import Pinecone
+    _GRPC = False
 import os
-from typing import List, Dict, Any, Optional
-import uuid
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Optional, Union, Tuple
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from model_connectors import EmbeddingAdapter, EmbeddingAdapterFactory
 
 class StorerError(Exception):
@@ -41,6 +54,24 @@ class VectorDbStorer(Storer):
     pass
 
 class PineconeStorer(VectorDbStorer):
+    # Vectors per upsert request: Pinecone accepts up to 1000 vectors and 2MB per request,
+    # over REST(JSON encoded floats) 100 vectors is the recommended batch
+    _UPSERT_BATCH = 1000 if _GRPC else 100
+    _UPSERT_MAX_BYTES = 2 * 1024 * 1024
+    _BYTES_PER_VALUE = 4 if _GRPC else 20
+    # Texts embedded per adapter call, the adapter batches and parallelizes its own requests
+    _EMBED_WINDOW = 1000
+    # Upsert requests in flight while the next window is embedded
+    _UPSERT_CONCURRENCY = 4
+    # Indexes known to exist per (Pinecone API key, index name): time last confirmed, shared by every storer
+    _INDEX_EXISTS_TTL = 60
+    _existing_indexes: Dict[Tuple[str, str], float] = {}
+    _existing_indexes_lock = threading.Lock()
+    # Chunk attributes stored as vector metadata(None values are left out, Pinecone rejects them)
+    _METADATA_FIELDS = ('law_name', 'part', 'chapter', 'sign', 'section', 'text')
+    # Embeddings kept in memory for repeated texts(boilerplate headers, repeated definitions), LRU evicted
+    _EMBEDDING_CACHE_SIZE = 50000
+
     def __init__(self, 
                  api_key: str = None, 
                  index_name: str = "law-agent", 
@@ -60,7 +91,6 @@ class PineconeStorer(VectorDbStorer):
         Raises:
             ValueError: If parameters are invalid
             ConfigurationError: If configuration is invalid
-            DatabaseConnectionError: If connection fails
         """
         super().__init__()
         
@@ -77,48 +107,106 @@ class PineconeStorer(VectorDbStorer):
         if not self.api_key:
             raise ConfigurationError("Pinecone API key must be provided either as parameter or PINECONE_API_KEY environment variable")
         
-        # Set up embedding adapter
+        # Validate the embedding adapter setup, the adapter itself(a local model can take
+        # seconds and hundreds of MB to load) is created on first use
         try:
             if embedding_adapter:
                 if not isinstance(embedding_adapter, EmbeddingAdapter):
                     raise ValueError("embedding_adapter must be an instance of EmbeddingAdapter")
-                self.embedding_adapter = embedding_adapter
             elif embedding_config:
                 if not isinstance(embedding_config, dict):
                     raise ValueError("embedding_config must be a dictionary")
-                self.embedding_adapter = EmbeddingAdapterFactory.create_from_config(embedding_config)
             else:
-                # Create default local embedding adapter
-                default_config = {'provider': 'local', 'model_name': 'paraphrase-multilingual-MiniLM-L12-v2'}
-                self.embedding_adapter = EmbeddingAdapterFactory.create_from_config(default_config)
+                # Default local embedding adapter
+                embedding_config = {'provider': 'local', 'model_name': 'paraphrase-multilingual-MiniLM-L12-v2'}
         except Exception as e:
             raise ConfigurationError(f"Failed to set up embedding adapter: {e}")
+        self._embedding_adapter = embedding_adapter
+        self._embedding_config = embedding_config
         
         self.dimension = dimension
         
-        # Initialize Pinecone connection
-        try:
-            self.pc = Pinecone(api_key=self.api_key)
-        except Exception as e:
-            raise DatabaseConnectionError(f"Failed to connect to Pinecone: {e}")
+        # Pinecone connection and index are set up on first use
+        self._pc = None
+        self._index = None
+        self._init_lock = threading.Lock()
         
-        try:
-            self._ensure_index_exists()
-            self.index = self.pc.Index(self.index_name)
-        except Exception as e:
-            raise DatabaseConnectionError(f"Failed to access Pinecone index '{self.index_name}': {e}")
+        # Text digest -> float32 embedding row
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+    
+    @property
+    def embedding_adapter(self) -> EmbeddingAdapter:
+        """
+        Embedding adapter, created from embedding_config on first access
+        
+        Raises:
+            ConfigurationError: If the adapter can't be created
+        """
+        if self._embedding_adapter is None:
+            with self._init_lock:
+                if self._embedding_adapter is None:
+                    try:
+                        self._embedding_adapter = EmbeddingAdapterFactory.create_from_config(self._embedding_config)
+                    except Exception as e:
+                        raise ConfigurationError(f"Failed to set up embedding adapter: {e}")
+        return self._embedding_adapter
+    
+    @property
+    def pc(self) -> Pinecone:
+        """
+        Pinecone client, connected on first access
+        
+        Raises:
+            DatabaseConnectionError: If connection fails
+        """
+        if self._pc is None:
+            with self._init_lock:
+                if self._pc is None:
+                    try:
+                        self._pc = Pinecone(api_key=self.api_key)
+                    except Exception as e:
+                        raise DatabaseConnectionError(f"Failed to connect to Pinecone: {e}")
+        return self._pc
+    
+    @property
+    def index(self):
+        """
+        Pinecone index, created if missing on first access
+        
+        Raises:
+            DatabaseConnectionError: If connection or index access fails
+        """
+        if self._index is None:
+            pc = self.pc
+            with self._init_lock:
+                if self._index is None:
+                    try:
+                        self._ensure_index_exists()
+                        self._index = pc.Index(self.index_name)
+                    except Exception as e:
+                        raise DatabaseConnectionError(f"Failed to access Pinecone index '{self.index_name}': {e}")
+        return self._index
     
     def _ensure_index_exists(self):
         """
-        Create index if it doesn't exist
+        Create index if it doesn't exist, checked at most once per _INDEX_EXISTS_TTL seconds
         
         Raises:
             DatabaseConnectionError: If index creation fails
         """
+        key = (self.api_key, self.index_name)
+        now = time.monotonic()
+        with self._existing_indexes_lock:
+            checked = self._existing_indexes.get(key)
+        if checked is not None and now - checked < self._INDEX_EXISTS_TTL:
+            return
+        
         try:
-            existing_indexes = self.pc.list_indexes()
-            
-            if self.index_name not in existing_indexes.names():
+            # Describing the one index is cheaper than listing every index of the project
+            try:
+                self.pc.describe_index(self.index_name)
+            except NotFoundException:
                 self.pc.create_index(
                     name=self.index_name,
                     dimension=self.dimension,
@@ -130,8 +218,11 @@ class PineconeStorer(VectorDbStorer):
                 )
         except Exception as e:
             raise DatabaseConnectionError(f"Failed to ensure index exists: {e}")
+        
+        with self._existing_indexes_lock:
+            self._existing_indexes[key] = now
     
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of texts using the configured adapter
         
@@ -139,7 +230,7 @@ class PineconeStorer(VectorDbStorer):
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dim), one row per text
             
         Raises:
             ValueError: If texts is invalid
@@ -152,14 +243,57 @@ class PineconeStorer(VectorDbStorer):
             raise ValueError("Texts must be a list")
         
         if not texts:
-            return []
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
         
-        try:
-            return self.embedding_adapter.embed_documents(texts)
-        except Exception as e:
-            raise StorageError(f"Failed to generate embeddings: {e}")
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+        rows = {}
+        with self._embedding_cache_lock:
+            for key in keys:
+                row = self._embedding_cache.get(key)
+                if row is not None:
+                    self._embedding_cache.move_to_end(key)
+                    rows[key] = row
+        
+        # Only texts not seen before are embedded, each one once
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in rows:
+                misses.setdefault(key, text)
+        
+        if misses:
+            try:
+                # A contiguous float32 array takes 4 bytes per value instead of a Python float object,
+                # no copy for the adapters already returning one
+                new_rows = np.asarray(self.embedding_adapter.embed_documents(list(misses.values())), dtype=np.float32)
+            except Exception as e:
+                raise StorageError(f"Failed to generate embeddings: {e}")
+            
+            if len(new_rows) != len(misses):
+                raise StorageError(f"Failed to generate embeddings: expected {len(misses)} embeddings, got {len(new_rows)}")
+            
+            if len(misses) == len(keys):
+                # Nothing cached and no repeated text, the adapter result is already in order
+                self._cache_embeddings(zip(misses, new_rows))
+                return new_rows
+            
+            rows.update(zip(misses, new_rows))
+            self._cache_embeddings(zip(misses, new_rows))
+        
+        return np.stack([rows[key] for key in keys])
+    
+    def _cache_embeddings(self, items):
+        """Add (digest, embedding row) items to the embedding cache, evicting the least recently used"""
+        with self._embedding_cache_lock:
+            for key, row in items:
+                # A copy, a view would keep the whole adapter result alive and share memory with the returned array
+                self._embedding_cache[key] = row.copy()
+                self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > self._EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
     
-    def store(self, chunks_to_store: List[Dict[str, Any]], embeddings: List[List[float]] = None) -> List[Dict[str, Any]]:
+    def store(self,
+              chunks_to_store: List[Dict[str, Any]],
+              embeddings: Union[List[List[float]], np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Store data into Pinecone DB.
         
@@ -168,7 +302,7 @@ class PineconeStorer(VectorDbStorer):
                         should be stored divided to chunks(with metadata).
                         Each chunk should have 'text' field and optional metadata fields:
                         'law_name', 'part', 'chapter', 'sign', 'section'
-            embeddings: Optional list of embedding vectors. If not provided, 
+            embeddings: Optional list(or 2D float32 array) of embedding vectors. If not provided, 
                        will generate them using the configured embedding model.
         Returns:
             list of chunks, with metadata and id in Pinecone DB for
@@ -176,6 +310,7 @@ class PineconeStorer(VectorDbStorer):
         Raises:
             ValueError: If inputs are invalid
             StorageError: If storage operation fails
+            DatabaseConnectionError: If connecting to Pinecone on first use fails
         """
         if chunks_to_store is None:
             raise ValueError("chunks_to_store cannot be None")
@@ -186,72 +321,58 @@ class PineconeStorer(VectorDbStorer):
         if not chunks_to_store:
             return []
         
-        # Validate chunks structure
+        if embeddings is not None:
+            if not isinstance(embeddings, (list, np.ndarray)):
+                raise ValueError("embeddings must be a list or numpy array")
+            if len(embeddings) != len(chunks_to_store):
+                raise ValueError("Number of embeddings must match number of parsed data items")
+        
+        # A 2D array's rows are all non-empty arrays, other embeddings are checked one by one
+        check_embeddings = embeddings is not None and not (
+            isinstance(embeddings, np.ndarray) and embeddings.ndim == 2 and embeddings.shape[1] > 0)
+        
+        # Validate chunks and embeddings structure in one pass
         for i, chunk in enumerate(chunks_to_store):
             if not isinstance(chunk, dict):
                 raise ValueError(f"Chunk at index {i} must be a dictionary")
             if 'text' not in chunk:
                 raise ValueError(f"Chunk at index {i} must contain 'text' field")
-        
-        if embeddings is not None:
-            if not isinstance(embeddings, list):
-                raise ValueError("embeddings must be a list")
-            if len(embeddings) != len(chunks_to_store):
-                raise ValueError("Number of embeddings must match number of parsed data items")
-            
-            # Validate embedding structure
-            for i, embedding in enumerate(embeddings):
-                if not embedding:
+            if check_embeddings:
+                embedding = embeddings[i]
+                if not isinstance(embedding, (list, np.ndarray)):
+                    raise ValueError(f"Embedding at index {i} must be a list or numpy array")
+                if len(embedding) == 0:
                     raise ValueError(f"Embedding at index {i} cannot be empty")
-                if not isinstance(embedding, list):
-                    raise ValueError(f"Embedding at index {i} must be a list")
+        
+        index = self.index
         
         try:
-            # Generate embeddings if not provided
-            if embeddings is None:
-                texts = [item.get('text', '') for item in chunks_to_store]
-                embeddings = self._generate_embeddings(texts)
-            
             vectors = []
             
-            for i, item in enumerate(chunks_to_store):
-                try:
-                    # Create metadata from all attributes except 'text'
-                    metadata = {
-                        'law_name': item.get('law_name'),
-                        'part': item.get('part'),
-                        'chapter': item.get('chapter'), 
-                        'sign': item.get('sign'),
-                        'section': item.get('section')
-                    }
-                    
-                    # Remove None values from metadata
-                    metadata = {k: v for k, v in metadata.items() if v is not None}
+            # Each window is embedded while the upserts of the previous windows are in flight
+            with ThreadPoolExecutor(max_workers=self._UPSERT_CONCURRENCY) as ex:
+                pending = deque()
+                for start in range(0, len(chunks_to_store), self._EMBED_WINDOW):
+                    window = chunks_to_store[start:start + self._EMBED_WINDOW]
                     
-                    # Create unique ID for the vector
-                    vector_id = str(uuid.uuid4())
+                    # Generate embeddings if not provided
+                    if embeddings is None:
+                        window_embeddings = self._generate_embeddings([item.get('text', '') for item in window])
+                    else:
+                        window_embeddings = embeddings[start:start + self._EMBED_WINDOW]
                     
-                    vector_data = {
-                        'id': vector_id,
-                        'values': embeddings[i],
-                        'metadata': {
-                            **metadata,
-                            'text': item.get('text', '')
-                        }
-                    }
+                    window_vectors = self._to_vectors(window, window_embeddings, start)
+                    vectors.extend(window_vectors)
                     
-                    vectors.append(vector_data)
-                except Exception as e:
-                    raise StorageError(f"Failed to process chunk at index {i}: {e}")
-            
-            # Batch upsert to Pinecone (max 100 vectors per batch)
-            batch_size = 100
-            try:
-                for i in range(0, len(vectors), batch_size):
-                    batch = vectors[i:i + batch_size]
-                    self.index.upsert(vectors=batch)
-            except Exception as e:
-                raise StorageError(f"Failed to upsert vectors to Pinecone: {e}")
+                    # Batch upsert to Pinecone (max _UPSERT_BATCH vectors and _UPSERT_MAX_BYTES per batch)
+                    for batch in self._upsert_batches(window_vectors):
+                        # Backpressure: wait for the oldest request when too many are in flight
+                        if len(pending) >= self._UPSERT_CONCURRENCY:
+                            self._wait_upsert(pending.popleft())
+                        pending.append(ex.submit(index.upsert, vectors=batch))
+                
+                while pending:
+                    self._wait_upsert(pending.popleft())
             
             return vectors
             
@@ -259,6 +380,72 @@ class PineconeStorer(VectorDbStorer):
             if isinstance(e, (ValueError, StorageError)):
                 raise
             raise StorageError(f"Unexpected error during storage operation: {e}")
+    
+    @classmethod
+    def _upsert_batches(cls, vectors: List[Dict[str, Any]]):
+        """
+        Split vectors into upsert requests of at most _UPSERT_BATCH vectors and
+        about _UPSERT_MAX_BYTES(values plus UTF-8 text, the bulk of each vector)
+        """
+        batch, size = [], 0
+        for vector in vectors:
+            vector_size = (len(vector['values']) * cls._BYTES_PER_VALUE
+                           + len(vector['metadata'].get('text', '').encode('utf-8')))
+            if batch and (len(batch) >= cls._UPSERT_BATCH or size + vector_size > cls._UPSERT_MAX_BYTES):
+                yield batch
+                batch, size = [], 0
+            batch.append(vector)
+            size += vector_size
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def _wait_upsert(future):
+        try:
+            future.result()
+        except Exception as e:
+            raise StorageError(f"Failed to upsert vectors to Pinecone: {e}")
+    
+    @staticmethod
+    def _to_vectors(chunks: List[Dict[str, Any]],
+                    embeddings: Union[List[List[float]], np.ndarray],
+                    offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Build Pinecone vectors from chunks and their embeddings
+        
+        Args:
+            chunks: Chunks with 'text' and optional metadata fields
+            embeddings: One embedding vector per chunk
+            offset: Index of the first chunk in the stored list, for error messages
+            
+        Returns:
+            Vectors with id, values and metadata(including text)
+            
+        Raises:
+            StorageError: If a chunk can't be converted
+        """
+        # Random 128-bit ids(as uuid4), drawn for the whole batch in one call
+        ids = os.urandom(16 * len(chunks)).hex()
+        
+        try:
+            # Pinecone client only serializes plain lists of floats
+            if isinstance(embeddings, np.ndarray):
+                values = embeddings.tolist()
+            else:
+                values = [v.tolist() if isinstance(v, np.ndarray) else v for v in embeddings]
+            
+            vectors = [
+                {
+                    'id': ids[32 * i:32 * (i + 1)],
+                    'values': values[i],
+                    'metadata': {k: v for k in PineconeStorer._METADATA_FIELDS if (v := item.get(k)) is not None}
+                }
+                for i, item in enumerate(chunks)
+            ]
+        except Exception as e:
+            raise StorageError(f"Failed to process chunks starting at index {offset}: {e}")
+        
+        return vectors
 
 class RelationalDbStorer(Storer):
     pass
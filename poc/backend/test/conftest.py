@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules under test live in poc/backend, added to the import path once for all test files
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
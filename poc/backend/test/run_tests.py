@@ -4,14 +4,39 @@ import unittest
 import sys
 import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The same path setup as conftest.py, which unittest doesn't load
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+def run_parallel(start_dir: str):
+    """
+    Run the tests sharded across all cores with pytest-xdist, one test file per worker
+    at a time so class-level patches and parsed fixtures are set up once per file.
+    Returns the exit code, or None if pytest-xdist isn't installed.
+    """
+    try:
+        import pytest
+        import xdist  # noqa: F401
+    except ImportError:
+        return None
+    return pytest.main(['-q', '-n', 'auto', '--dist', 'loadfile', start_dir])
 
 if __name__ == '__main__':
-    loader = unittest.TestLoader()
     start_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    exit_code = run_parallel(start_dir)
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    loader = unittest.TestLoader()
     suite = loader.discover(start_dir, pattern='test_*.py')
     
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    # Results go through a 64KB buffer instead of a write per test, output of
+    # the tests themselves is captured and only shown for failing tests
+    with open(sys.stderr.fileno(), 'w', buffering=64 * 1024, encoding=sys.stderr.encoding,
+              errors='backslashreplace', closefd=False) as stream:
+        runner = unittest.TextTestRunner(stream=stream, verbosity=2, buffer=True)
+        result = runner.run(suite)
     
-    sys.exit(0 if result.wasSuccessful() else 1)
\ No newline at end of file
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -1,49 +1,46 @@
 import unittest
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import patch, Mock, MagicMock, AsyncMock
+import asyncio
+import io
+import httpx
 import requests
-from bs4 import BeautifulSoup
-import sys
 import os
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import subprocess
+import sys
 
 from fetchers import WikiFetcher, FetcherError, NetworkError, ParseError
 
 
 class TestWikiFetcher(unittest.TestCase):
 
-    def setUp(self):
-        self.sample_law_name = "חוק הבטיחות"
-        self.sample_url = "https://he.wikisource.org/w/index.php?title=מקור:חוק_הבטיחות&action=edit"
-        
-        self.sample_html = '''
-        <html>
-            <body>
-                <textarea id="wpTextbox1">
-                <שם>חוק הבטיחות</שם>
-                <מקור>ספר החוקים הפתוח</מקור>
-                = חלק א' =
-                @ 1. כל אדם זכאי לבטיחות.
-                @ 2. המדינה תדאג לבטיחות הציבור.
-                </textarea>
-            </body>
-        </html>
-        '''
-        
-        self.sample_law_list_html = '''
-        <html>
-            <body>
-                <dd><a href="/wiki/מקור:חוק_הבטיחות">חוק הבטיחות</a></dd>
-                <dd><a href="/wiki/מקור:חוק_השכר">חוק השכר</a></dd>
-                <dd><a href="/wiki/מקור:חוק_הבחירות">חוק הבחירות</a></dd>
-            </body>
-        </html>
-        '''
+    # Fixtures are built once with the class, tests only read them
+    sample_law_name = "חוק הבטיחות"
+    sample_url = ("https://he.wikisource.org/w/index.php?title=מקור:"
+                  "%D7%97%D7%95%D7%A7_%D7%94%D7%91%D7%98%D7%99%D7%97%D7%95%D7%AA&action=raw")
+    
+    sample_wikitext = '''
+<שם>חוק הבטיחות</שם>
+<מקור>ספר החוקים הפתוח</מקור>
+= חלק א' =
+@ 1. כל אדם זכאי לבטיחות.
+@ 2. המדינה תדאג לבטיחות הציבור.
+'''
+    
+    sample_law_list_html = '''
+    <html>
+        <body>
+            <dd><a href="/wiki/מקור:חוק_הבטיחות">חוק הבטיחות</a></dd>
+            <dd><a href="/wiki/מקור:חוק_השכר">חוק השכר</a></dd>
+            <dd><a href="/wiki/מקור:חוק_הבחירות">חוק הבחירות</a></dd>
+        </body>
+    </html>
+    '''
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_success(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_success(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.text = self.sample_html
+        mock_response.text = self.sample_wikitext
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -52,70 +49,74 @@ class TestWikiFetcher(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn("חוק הבטיחות", result)
         self.assertIn("@ 1. כל אדם זכאי לבטיחות.", result)
-        mock_get.assert_called_once()
+        mock_get.assert_called_once_with(self.sample_url, timeout=30)
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_empty_resource(self, mock_get):
+    def test_law_url_quotes_reserved_chars(self):
+        url = WikiFetcher.law_url("חוק א&ב?ג/ד")
+        
+        self.assertTrue(url.startswith("https://he.wikisource.org/w/index.php?title=מקור:"))
+        self.assertTrue(url.endswith("%26%D7%91%3F%D7%92%2F%D7%93&action=raw"))
+        self.assertEqual(url.count('&'), 1)
+
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_empty_resource(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         with self.assertRaises(ValueError) as context:
             WikiFetcher.fetch_one("")
         
         self.assertIn("Resource name cannot be empty", str(context.exception))
         mock_get.assert_not_called()
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_none_resource(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_none_resource(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         with self.assertRaises(ValueError) as context:
             WikiFetcher.fetch_one(None)
         
         self.assertIn("Resource name cannot be empty", str(context.exception))
         mock_get.assert_not_called()
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_network_error(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_network_error(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_get.side_effect = requests.RequestException("Network error")
         
         with self.assertRaises(NetworkError) as context:
             WikiFetcher.fetch_one(self.sample_law_name)
         
         self.assertIn("Failed to fetch resource", str(context.exception))
-        self.assertEqual(mock_get.call_count, 3)  # Default retries
+        mock_get.assert_called_once()  # Retries are handled by the session's adapter
+        mock_get_session.assert_called_once_with(3)  # Default retries
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_http_error(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_http_error(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.HTTPError("404 Not Found")
+        mock_response.status_code = 500
+        mock_response.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
         mock_get.return_value = mock_response
         
         with self.assertRaises(NetworkError):
             WikiFetcher.fetch_one(self.sample_law_name)
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_parse_error(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_missing_page(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.text = "invalid html <>"
-        mock_response.raise_for_status.return_value = None
+        mock_response.status_code = 404
+        mock_response.raise_for_status.side_effect = requests.HTTPError("404 Not Found")
+        mock_get.return_value = mock_response
         
-        with patch('fetchers.BeautifulSoup') as mock_soup:
-            mock_soup.side_effect = Exception("Parse error")
-            mock_get.return_value = mock_response
-            
-            with self.assertRaises(ParseError) as context:
-                WikiFetcher.fetch_one(self.sample_law_name)
-            
-            self.assertIn("Failed to parse HTML content", str(context.exception))
-
-    @patch('fetchers.requests.get')
-    def test_fetch_one_no_content_found(self, mock_get):
-        html_no_content = '''
-        <html>
-            <body>
-                <div>No textarea found</div>
-            </body>
-        </html>
-        '''
+        result = WikiFetcher.fetch_one(self.sample_law_name)
         
+        self.assertIsNone(result)
+        mock_get.assert_called_once()
+
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_no_content_found(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.text = html_no_content
+        mock_response.text = ""
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -123,18 +124,11 @@ class TestWikiFetcher(unittest.TestCase):
         
         self.assertIsNone(result)
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_empty_content(self, mock_get):
-        html_empty_content = '''
-        <html>
-            <body>
-                <textarea id="wpTextbox1"></textarea>
-            </body>
-        </html>
-        '''
-        
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_empty_content(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.text = html_empty_content
+        mock_response.text = "  \n  \n"
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -142,10 +136,11 @@ class TestWikiFetcher(unittest.TestCase):
         
         self.assertIsNone(result)
 
-    @patch('fetchers.requests.get')
-    def test_fetch_one_with_custom_timeout_retries(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_one_with_custom_timeout_retries(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
-        mock_response.text = self.sample_html
+        mock_response.text = self.sample_wikitext
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -154,22 +149,112 @@ class TestWikiFetcher(unittest.TestCase):
         mock_get.assert_called_once()
         args, kwargs = mock_get.call_args
         self.assertEqual(kwargs['timeout'], 60)
+        mock_get_session.assert_called_once_with(5)
 
-    @patch('fetchers.requests.get')
-    def test_fetch_all_success(self, mock_get):
-        def mock_get_side_effect(url, **kwargs):
-            if "ספר_החוקים_הפתוח" in url:
-                mock_response = Mock()
-                mock_response.text = self.sample_law_list_html
-                mock_response.raise_for_status.return_value = None
-                return mock_response
-            else:
-                mock_response = Mock()
-                mock_response.text = self.sample_html
-                mock_response.raise_for_status.return_value = None
-                return mock_response
+    @patch.dict(os.environ, {'WIKI_CACHE': '1'})
+    @patch.dict('fetchers.WikiFetcher._sessions', clear=True)
+    def test_get_session_disk_cache(self):
+        import requests_cache
+        from urllib3 import HTTPResponse
+        
+        class WikiAdapter(requests.adapters.HTTPAdapter):
+            def send(self, request, **kwargs):
+                # Headers as MediaWiki sends them for action=raw
+                raw = HTTPResponse(body=io.BytesIO("תוכן".encode('utf-8')), status=200, preload_content=False,
+                                   headers={'Cache-Control': 'private, s-maxage=0, max-age=0, must-revalidate'})
+                return self.build_response(request, raw)
+        
+        # A real cache session, kept in memory instead of under ./.cache
+        cached_session = requests_cache.CachedSession
+        with patch('requests_cache.CachedSession',
+                   side_effect=lambda **kwargs: cached_session(**{**kwargs, 'backend': 'memory'})):
+            session = WikiFetcher.get_session()
+        adapter = WikiAdapter()
+        session.mount('https://', adapter)
+        
+        with patch.object(adapter, 'send', wraps=adapter.send) as mock_send:
+            first = session.get(WikiFetcher.law_url(self.sample_law_name))
+            second = session.get(WikiFetcher.law_url(self.sample_law_name))
+        
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.text, "תוכן")
+        mock_send.assert_called_once()
+
+    def test_get_session_reused(self):
+        session = WikiFetcher.get_session(4)
+        
+        self.assertIs(WikiFetcher.get_session(4), session)
+        self.assertIsNot(WikiFetcher.get_session(2), session)
+        adapter = session.get_adapter('https://he.wikisource.org')
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertEqual(session.headers['Connection'], 'keep-alive')
+
+    def _mock_async_session(self, text=None, error=None):
+        mock_session = MagicMock()
+        mock_session.get = AsyncMock()
+        if error is not None:
+            mock_session.get.side_effect = error
+        else:
+            mock_response = Mock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.text = text
+            mock_session.get.return_value = mock_response
+        return mock_session
+
+    def test_fetch_one_async_success(self):
+        mock_session = self._mock_async_session(text=self.sample_wikitext)
+        
+        result = asyncio.run(WikiFetcher._fetch_one_async(mock_session, self.sample_law_name, asyncio.Semaphore(1)))
+        
+        self.assertIn("@ 1. כל אדם זכאי לבטיחות.", result)
+        mock_session.get.assert_called_once()
+
+    @patch('fetchers.asyncio.sleep', new_callable=AsyncMock)
+    def test_fetch_one_async_network_error(self, mock_sleep):
+        mock_session = self._mock_async_session(error=httpx.ConnectError("Network error"))
+        
+        with self.assertRaises(NetworkError) as context:
+            asyncio.run(WikiFetcher._fetch_one_async(mock_session, self.sample_law_name, asyncio.Semaphore(1)))
         
-        mock_get.side_effect = mock_get_side_effect
+        self.assertIn("Failed to fetch resource", str(context.exception))
+        self.assertEqual(mock_session.get.call_count, 3)  # Default retries
+
+    @patch('fetchers.asyncio.sleep', new_callable=AsyncMock)
+    def test_fetch_one_async_missing_page(self, mock_sleep):
+        mock_session = self._mock_async_session()
+        mock_session.get.return_value = httpx.Response(404, request=httpx.Request("GET", "https://example.org"))
+        
+        result = asyncio.run(WikiFetcher._fetch_one_async(mock_session, self.sample_law_name, asyncio.Semaphore(1)))
+        
+        self.assertIsNone(result)
+        mock_session.get.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('fetchers.asyncio.sleep', new_callable=AsyncMock)
+    def test_fetch_one_async_status_error_retries(self, mock_sleep):
+        # Gateway errors are retried, any other error status fails on the first attempt
+        for status, attempts in ((403, 1), (503, 3)):
+            with self.subTest(status=status):
+                response = httpx.Response(status, request=httpx.Request("GET", "https://example.org"))
+                mock_session = self._mock_async_session()
+                mock_session.get.return_value = response
+                
+                with self.assertRaises(NetworkError) as context:
+                    asyncio.run(WikiFetcher._fetch_one_async(mock_session, self.sample_law_name, asyncio.Semaphore(1)))
+                
+                self.assertIn(str(status), str(context.exception))
+                self.assertEqual(mock_session.get.call_count, attempts)
+
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_success(self, mock_get_session, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
+        mock_response = Mock()
+        mock_response.text = self.sample_law_list_html
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        mock_fetch_one_async.return_value = "Law content"
         
         result = WikiFetcher.fetch_all(max_laws=2)
         
@@ -178,8 +263,9 @@ class TestWikiFetcher(unittest.TestCase):
         self.assertIn('law_name', result[0])
         self.assertIn('content', result[0])
 
-    @patch('fetchers.requests.get')
-    def test_fetch_all_network_error(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_network_error(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_get.side_effect = requests.RequestException("Network error")
         
         with self.assertRaises(NetworkError) as context:
@@ -187,22 +273,43 @@ class TestWikiFetcher(unittest.TestCase):
         
         self.assertIn("Failed to fetch law list page", str(context.exception))
 
-    @patch('fetchers.requests.get')
-    def test_fetch_all_parse_error(self, mock_get):
-        with patch('fetchers.BeautifulSoup') as mock_soup:
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_list_laws_uses_selectolax(self, mock_get_session):
+        import fetchers
+        from selectolax.lexbor import LexborHTMLParser
+        
+        mock_response = Mock()
+        mock_response.text = self.sample_law_list_html
+        mock_response.raise_for_status.return_value = None
+        mock_get_session.return_value.get.return_value = mock_response
+        
+        with patch('fetchers.HTMLParser', wraps=LexborHTMLParser) as mock_parser:
+            laws = WikiFetcher.list_laws()
+        
+        # The list page is parsed once by the C parser, BeautifulSoup is not used
+        mock_parser.assert_called_once_with(self.sample_law_list_html)
+        self.assertFalse(hasattr(fetchers, 'BeautifulSoup'))
+        self.assertEqual([law['law_name'] for law in laws], ["חוק הבטיחות", "חוק השכר", "חוק הבחירות"])
+        self.assertEqual(laws[0]['url'], "https://he.wikisource.org/wiki/מקור:חוק_הבטיחות")
+
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_parse_error(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
+        with patch('fetchers.HTMLParser') as mock_parser:
             mock_response = Mock()
             mock_response.text = "html"
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
-            mock_soup.side_effect = Exception("Parse error")
+            mock_parser.side_effect = Exception("Parse error")
             
             with self.assertRaises(ParseError) as context:
                 WikiFetcher.fetch_all()
             
             self.assertIn("Failed to parse law list HTML", str(context.exception))
 
-    @patch('fetchers.requests.get')
-    def test_fetch_all_no_law_links(self, mock_get):
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_no_law_links(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         html_no_links = '''
         <html>
             <body>
@@ -221,62 +328,156 @@ class TestWikiFetcher(unittest.TestCase):
         
         self.assertIn("No law links found on the page", str(context.exception))
 
-    @patch('fetchers.requests.get')
-    def test_fetch_all_max_laws_limit(self, mock_get):
-        def mock_get_side_effect(url, **kwargs):
-            if "ספר_החוקים_הפתוח" in url:
-                mock_response = Mock()
-                mock_response.text = self.sample_law_list_html
-                mock_response.raise_for_status.return_value = None
-                return mock_response
-            else:
-                mock_response = Mock()
-                mock_response.text = self.sample_html
-                mock_response.raise_for_status.return_value = None
-                return mock_response
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_skips_invalid_links(self, mock_get_session, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
+        mock_response = Mock()
+        mock_response.text = '''
+        <html>
+            <body>
+                <dd><a>חוק ללא קישור</a></dd>
+                <dd><a href="/wiki/מקור:ריק">   </a></dd>
+                <dd><a href="/wiki/מקור:חוק_השכר"> חוק השכר </a></dd>
+            </body>
+        </html>
+        '''
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        mock_fetch_one_async.return_value = "Law content"
         
-        mock_get.side_effect = mock_get_side_effect
+        result = WikiFetcher.fetch_all()
+        
+        self.assertEqual([r['law_name'] for r in result], ["חוק השכר"])
+
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_max_laws_limit(self, mock_get_session, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
+        mock_response = Mock()
+        mock_response.text = self.sample_law_list_html
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        mock_fetch_one_async.return_value = "Law content"
         
         result = WikiFetcher.fetch_all(max_laws=1)
         
         self.assertEqual(len(result), 1)
+        self.assertEqual(mock_fetch_one_async.call_count, 1)
 
-    @patch('fetchers.WikiFetcher.fetch_one')
-    @patch('fetchers.requests.get')
-    def test_fetch_all_partial_failure(self, mock_get, mock_fetch_one):
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_partial_failure(self, mock_get_session, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
         mock_response.text = self.sample_law_list_html
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
-        def mock_fetch_side_effect(law_name, **kwargs):
+        def mock_fetch_side_effect(session, law_name, sem, **kwargs):
             if law_name == "חוק הבטיחות":
                 return "Law content"
             else:
                 raise Exception("Fetch failed")
         
-        mock_fetch_one.side_effect = mock_fetch_side_effect
+        mock_fetch_one_async.side_effect = mock_fetch_side_effect
         
         result = WikiFetcher.fetch_all()
         
         self.assertGreater(len(result), 0)
         self.assertEqual(result[0]['law_name'], "חוק הבטיחות")
 
-    @patch('fetchers.WikiFetcher.fetch_one')
-    @patch('fetchers.requests.get')
-    def test_fetch_all_complete_failure(self, mock_get, mock_fetch_one):
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_complete_failure(self, mock_get_session, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
         mock_response.text = self.sample_law_list_html
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
-        mock_fetch_one.side_effect = Exception("All fetch failed")
+        mock_fetch_one_async.side_effect = Exception("All fetch failed")
         
         with self.assertRaises(FetcherError) as context:
             WikiFetcher.fetch_all()
         
         self.assertIn("Failed to fetch any laws", str(context.exception))
 
+    @patch('fetchers.httpx', None)
+    @patch('fetchers.WikiFetcher.fetch_one')
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_threaded_fallback(self, mock_get_session, mock_fetch_one):
+        mock_get = mock_get_session.return_value.get
+        mock_response = Mock()
+        mock_response.text = self.sample_law_list_html
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        def mock_fetch_side_effect(law_name, timeout, retries):
+            if law_name == "חוק השכר":
+                raise NetworkError("Fetch failed")
+            return f"{law_name} content"
+        
+        mock_fetch_one.side_effect = mock_fetch_side_effect
+        
+        result = WikiFetcher.fetch_all()
+        
+        self.assertEqual(mock_fetch_one.call_count, 3)
+        self.assertEqual([r['law_name'] for r in result], ["חוק הבטיחות", "חוק הבחירות"])
+        self.assertEqual(result[1]['content'], "חוק הבחירות content")
+
+    @patch('fetchers.WikiFetcher._fetch_one_async', new_callable=AsyncMock)
+    @patch('fetchers.WikiFetcher.fetch_one')
+    @patch('fetchers.WikiFetcher.get_session')
+    def test_fetch_all_inside_event_loop(self, mock_get_session, mock_fetch_one, mock_fetch_one_async):
+        mock_get = mock_get_session.return_value.get
+        mock_response = Mock()
+        mock_response.text = self.sample_law_list_html
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        mock_fetch_one.return_value = "Law content"
+        
+        async def fetch_all():
+            return WikiFetcher.fetch_all()
+        
+        result = asyncio.run(fetch_all())
+        
+        # asyncio.run can't be nested, the threaded path is used instead
+        self.assertEqual(len(result), 3)
+        self.assertEqual(mock_fetch_one.call_count, 3)
+        mock_fetch_one_async.assert_not_called()
+
+    def test_import_without_h2_disables_async_path(self):
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # httpx installed without h2(a None sys.modules entry makes the import fail),
+        # with httpx None fetch_all uses the thread pool(see test_fetch_all_threaded_fallback)
+        code = "import sys; sys.modules['h2'] = None; import fetchers; print(fetchers.httpx)"
+        
+        output = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                capture_output=True, text=True, check=True).stdout
+        
+        self.assertEqual(output.strip(), "None")
+
+    @patch.dict(os.environ, {'WIKI_CACHE': ''})
+    @patch.dict('fetchers.WikiFetcher._sessions', clear=True)
+    @patch('fetchers.httpx', None)
+    @patch('fetchers.requests.Session')
+    def test_fetch_all_uses_session_pooling(self, mock_session_class):
+        def mock_get_side_effect(url, timeout):
+            mock_response = Mock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.text = self.sample_wikitext if url.endswith('&action=raw') else self.sample_law_list_html
+            return mock_response
+
+        mock_session_class.return_value.get.side_effect = mock_get_side_effect
+
+        result = WikiFetcher.fetch_all()
+
+        # The list page and every law go through one pooled session
+        self.assertEqual(len(result), 3)
+        mock_session_class.assert_called_once()
+        self.assertEqual(mock_session_class.return_value.get.call_count, 4)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch, Mock
+import asyncio
+import importlib.util
+import os
+from types import SimpleNamespace
+
+# The API's pipeline lives in rest-api/app, which isn't a package(the directory name has a dash)
+_LLM_PIPELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "rest-api", "app", "llm_pipeline.py")
+_spec = importlib.util.spec_from_file_location("llm_pipeline", _LLM_PIPELINE_PATH)
+llm_pipeline = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_pipeline)
+
+
+class FakeLLM:
+    """LLM whose astream yields the given steps: a string is a chunk, a number a pause in seconds, an exception is raised"""
+
+    def __init__(self, *steps):
+        self.steps = steps
+        self.cancelled = False
+
+    async def astream(self, prompt):
+        try:
+            for step in self.steps:
+                if isinstance(step, BaseException):
+                    raise step
+                if isinstance(step, str):
+                    yield SimpleNamespace(content=step)
+                else:
+                    await asyncio.sleep(step)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class TestPromptStream(unittest.TestCase):
+
+    def _pipeline(self, llm):
+        retriever = Mock()
+
+        async def ainvoke(question):
+            return [SimpleNamespace(page_content="context")]
+        retriever.ainvoke.side_effect = ainvoke
+
+        vectorstore = Mock()
+        vectorstore.as_retriever.return_value = retriever
+        with patch.object(llm_pipeline, '_get_llm', return_value=llm), \
+             patch.object(llm_pipeline, '_get_vectorstore', return_value=vectorstore):
+            return llm_pipeline.LLMPipeline(k=4)
+
+    def _collect(self, llm, **kwargs):
+        pipeline = self._pipeline(llm)
+
+        async def collect():
+            return [part async for part in pipeline.prompt_stream("question", **kwargs)]
+        return asyncio.run(collect())
+
+    def test_prompt_stream_flushes_at_min_chars(self):
+        parts = self._collect(FakeLLM("ab", "cd", "ef"), min_chars=4, max_delay=10)
+
+        # "ab" + "cd" reach min_chars, "ef" is flushed at the end of the answer
+        self.assertEqual(parts, ["abcd", "ef"])
+
+    def test_prompt_stream_flushes_at_max_delay(self):
+        parts = self._collect(FakeLLM("a", 0.3, "b"), min_chars=100, max_delay=0.05)
+
+        # "a" is flushed while the LLM is still generating, without waiting for "b"
+        self.assertEqual(parts, ["a", "b"])
+
+    def test_prompt_stream_llm_error_after_final_flush(self):
+        pipeline = self._pipeline(FakeLLM("ab", RuntimeError("LLM failed")))
+        parts = []
+
+        async def collect():
+            async for part in pipeline.prompt_stream("question", min_chars=100, max_delay=10):
+                parts.append(part)
+
+        with self.assertRaises(RuntimeError) as context:
+            asyncio.run(collect())
+
+        # The part generated before the error is still yielded
+        self.assertEqual(parts, ["ab"])
+        self.assertIn("LLM failed", str(context.exception))
+
+    def test_prompt_stream_close_cancels_reader(self):
+        llm = FakeLLM("ab", 10, "cd")
+        pipeline = self._pipeline(llm)
+
+        async def read_first_part():
+            stream = pipeline.prompt_stream("question", min_chars=2, max_delay=10)
+            first = await stream.__anext__()
+            await stream.aclose()
+            # Lets the cancelled reader task run
+            await asyncio.sleep(0.01)
+            return first, llm.cancelled
+
+        first, cancelled = asyncio.run(read_first_part())
+
+        self.assertEqual(first, "ab")
+        self.assertTrue(cancelled)
+
+
+if __name__ == '__main__':
+    unittest.main()
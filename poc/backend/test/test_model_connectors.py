@@ -1,17 +1,36 @@
 import unittest
 from unittest.mock import patch, Mock, MagicMock
 import os
+import subprocess
 import sys
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import threading
+from types import SimpleNamespace
+import numpy as np
 
 from model_connectors import (
     EmbeddingAdapter, GoogleEmbeddingAdapter, HuggingFaceEmbeddingAdapter, 
-    LocalEmbeddingAdapter, EmbeddingAdapterFactory,
+    LocalEmbeddingAdapter, EmbeddingAdapterFactory, _QueryBatcher,
     EmbeddingError, ModelLoadError, EmbeddingGenerationError, ConfigurationError
 )
 
 
+# Embeddings returned by the mocked models and expected back from the adapters
+_DOCUMENT_EMBEDDINGS = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+_QUERY_EMBEDDING = [0.1, 0.2, 0.3]
+
+
+class _Array:
+    """Stands in for an encoded numpy row, the adapters only call tolist on it"""
+    __slots__ = ('values',)
+    
+    def __init__(self, values):
+        self.values = values
+    
+    def tolist(self):
+        return self.values
+
+
 class TestEmbeddingAdapter(unittest.TestCase):
     """Test the abstract base class"""
     
@@ -22,20 +41,33 @@ class TestEmbeddingAdapter(unittest.TestCase):
 
 class TestGoogleEmbeddingAdapter(unittest.TestCase):
     
+    # One patch and one embeddings mock for the whole class, reset before each test
+    @classmethod
+    def setUpClass(cls):
+        cls._patcher = patch('langchain_google_genai.GoogleGenerativeAIEmbeddings')
+        cls.mock_google_embeddings = cls._patcher.start()
+        # Only the two methods the adapters call, any other attribute access fails
+        cls.mock_embeddings = SimpleNamespace(embed_documents=Mock(return_value=_DOCUMENT_EMBEDDINGS),
+                                              embed_query=Mock(return_value=_QUERY_EMBEDDING))
+        cls.mock_google_embeddings.return_value = cls.mock_embeddings
+        # Shared by the tests that don't check initialization
+        cls.adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+    
     def setUp(self):
-        self.mock_embeddings = Mock()
-        self.mock_embeddings.embed_documents.return_value = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
-        self.mock_embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+        self.mock_google_embeddings.reset_mock(side_effect=True)
+        self.mock_embeddings.embed_documents.reset_mock(side_effect=True)
+        self.mock_embeddings.embed_query.reset_mock(side_effect=True)
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_init_success(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
+    def test_init_success(self):
         adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
         
         self.assertEqual(adapter.model_name, "test-model")
         self.assertEqual(adapter.api_key, "test-api-key")
-        mock_google_embeddings.assert_called_once_with(
+        self.mock_google_embeddings.assert_called_once_with(
             model="test-model",
             google_api_key="test-api-key"
         )
@@ -46,272 +78,443 @@ class TestGoogleEmbeddingAdapter(unittest.TestCase):
         
         self.assertIn("Model name cannot be empty", str(context.exception))
 
+    # Only the key the adapter reads is blanked, the rest of the environment is left alone
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': ''})
     def test_init_no_api_key(self):
-        with patch.dict(os.environ, {}, clear=True):
-            with self.assertRaises(ConfigurationError) as context:
-                GoogleEmbeddingAdapter("test-model")
-            
-            self.assertIn("Google API key must be provided", str(context.exception))
+        with self.assertRaises(ConfigurationError) as context:
+            GoogleEmbeddingAdapter("test-model")
+        
+        self.assertIn("Google API key must be provided", str(context.exception))
 
     @patch.dict(os.environ, {'GOOGLE_API_KEY': 'env-key'})
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_init_api_key_from_env(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
+    def test_init_api_key_from_env(self):
         adapter = GoogleEmbeddingAdapter("test-model")
         
         self.assertEqual(adapter.api_key, "env-key")
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_init_model_load_error(self, mock_google_embeddings):
-        mock_google_embeddings.side_effect = Exception("Model load failed")
+    def test_init_model_load_error(self):
+        self.mock_google_embeddings.side_effect = Exception("Model load failed")
         
         with self.assertRaises(ModelLoadError) as context:
             GoogleEmbeddingAdapter("test-model", "test-api-key")
         
         self.assertIn("Failed to initialize Google embeddings model", str(context.exception))
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_documents_success(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
+    def test_embed_documents_success(self):
+        result = self.adapter.embed_documents(["text1", "text2"])
         
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
-        result = adapter.embed_documents(["text1", "text2"])
-        
-        self.assertEqual(result, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, _DOCUMENT_EMBEDDINGS, rtol=1e-6)
         self.mock_embeddings.embed_documents.assert_called_once_with(["text1", "text2"])
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_documents_none_input(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
+    def test_embed_documents_single_call_per_batch(self):
+        self.mock_embeddings.embed_documents.side_effect = lambda batch: [[0.1] for _ in batch]
+        texts = [f"text{i}" for i in range(GoogleEmbeddingAdapter._BATCH)]
         
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
+        self.adapter.embed_documents(texts)
+        
+        # A full batch is one API request, never one request per text
+        self.mock_embeddings.embed_documents.assert_called_once_with(texts)
+
+    def test_embed_documents_batches_preserve_order(self):
+        self.mock_embeddings.embed_documents.side_effect = lambda batch: [[float(t)] for t in batch]
+        texts = [str(i) for i in range(250)]
+        
+        result = self.adapter.embed_documents(texts)
+        
+        self.assertEqual(result.tolist(), [[float(i)] for i in range(250)])
+        self.assertEqual(self.mock_embeddings.embed_documents.call_count, 3)
+        batch_sizes = sorted(len(c.args[0]) for c in self.mock_embeddings.embed_documents.call_args_list)
+        self.assertEqual(batch_sizes, [50, 100, 100])
+
+    @patch('time.sleep')
+    def test_embed_documents_retries_rate_limit(self, mock_sleep):
+        rate_limit_error = Exception("Resource exhausted")
+        rate_limit_error.code = 429
+        self.mock_embeddings.embed_documents.side_effect = [rate_limit_error, [[0.1, 0.2, 0.3]]]
+        
+        result = self.adapter.embed_documents(["text1"])
+        
+        np.testing.assert_allclose(result, [[0.1, 0.2, 0.3]], rtol=1e-6)
+        self.assertEqual(self.mock_embeddings.embed_documents.call_count, 2)
+
+    def test_embed_documents_cache(self):
+        self.mock_embeddings.embed_documents.side_effect = lambda batch: [[float(len(t))] for t in batch]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "emb.sqlite")
+            adapter = GoogleEmbeddingAdapter("test-model", "test-api-key", cache_path=cache_path)
+            first = adapter.embed_documents(["a", "bb", "a"])
+            
+            # A new adapter on the same cache file doesn't call the API again
+            adapter = GoogleEmbeddingAdapter("test-model", "test-api-key", cache_path=cache_path)
+            second = adapter.embed_documents(["bb", "a"])
+            adapter._cache._conn.close()
         
+        self.assertEqual(first.tolist(), [[1.0], [2.0], [1.0]])
+        self.assertEqual(second.tolist(), [[2.0], [1.0]])
+        self.mock_embeddings.embed_documents.assert_called_once_with(["a", "bb"])
+
+    def test_embed_documents_none_input(self):
         with self.assertRaises(ValueError) as context:
-            adapter.embed_documents(None)
+            self.adapter.embed_documents(None)
         
         self.assertIn("Texts list cannot be None", str(context.exception))
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_documents_empty_list(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
-        result = adapter.embed_documents([])
+    def test_embed_documents_empty_list(self):
+        result = self.adapter.embed_documents([])
         
-        self.assertEqual(result, [])
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(result.shape, (0, 0))
+        self.assertEqual(result.dtype, np.float32)
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_documents_generation_error(self, mock_google_embeddings):
+    def test_embed_documents_generation_error(self):
         self.mock_embeddings.embed_documents.side_effect = Exception("Generation failed")
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
         
         with self.assertRaises(EmbeddingGenerationError) as context:
-            adapter.embed_documents(["text1"])
+            self.adapter.embed_documents(["text1"])
         
         self.assertIn("Failed to generate embeddings for documents", str(context.exception))
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_query_success(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
-        result = adapter.embed_query("test query")
+    def test_embed_query_success(self):
+        result = self.adapter.embed_query("test query")
         
-        self.assertEqual(result, [0.1, 0.2, 0.3])
+        self.assertEqual(result, _QUERY_EMBEDDING)
         self.mock_embeddings.embed_query.assert_called_once_with("test query")
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_query_none_input(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
-        
+    def test_embed_query_none_input(self):
         with self.assertRaises(ValueError) as context:
-            adapter.embed_query(None)
+            self.adapter.embed_query(None)
         
         self.assertIn("Text cannot be None", str(context.exception))
 
-    @patch('model_connectors.GoogleGenerativeAIEmbeddings')
-    def test_embed_query_empty_text(self, mock_google_embeddings):
-        mock_google_embeddings.return_value = self.mock_embeddings
-        
-        adapter = GoogleEmbeddingAdapter("test-model", "test-api-key")
-        
+    def test_embed_query_empty_text(self):
         with self.assertRaises(ValueError) as context:
-            adapter.embed_query("   ")
+            self.adapter.embed_query("   ")
         
         self.assertIn("Text cannot be empty", str(context.exception))
 
 
 class TestHuggingFaceEmbeddingAdapter(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        cls._patcher = patch('langchain_huggingface.HuggingFaceEndpointEmbeddings')
+        cls.mock_hf_embeddings = cls._patcher.start()
+        cls.mock_embeddings = SimpleNamespace(embed_documents=Mock(return_value=_DOCUMENT_EMBEDDINGS),
+                                              embed_query=Mock(return_value=_QUERY_EMBEDDING))
+        cls.mock_hf_embeddings.return_value = cls.mock_embeddings
+        cls.adapter = HuggingFaceEmbeddingAdapter("test-model", "test-api-key")
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+    
     def setUp(self):
-        self.mock_embeddings = Mock()
-        self.mock_embeddings.embed_documents.return_value = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
-        self.mock_embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+        self.mock_hf_embeddings.reset_mock(side_effect=True)
+        self.mock_embeddings.embed_documents.reset_mock(side_effect=True)
+        self.mock_embeddings.embed_query.reset_mock(side_effect=True)
 
-    @patch('model_connectors.HuggingFaceEndpointEmbeddings')
-    def test_init_success(self, mock_hf_embeddings):
-        mock_hf_embeddings.return_value = self.mock_embeddings
-        
+    def test_init_success(self):
         adapter = HuggingFaceEmbeddingAdapter("test-model", "test-api-key")
         
         self.assertEqual(adapter.model_name, "test-model")
         self.assertEqual(adapter.api_key, "test-api-key")
-        mock_hf_embeddings.assert_called_once_with(
+        self.mock_hf_embeddings.assert_called_once_with(
             model="test-model",
             huggingfacehub_api_token="test-api-key"
         )
 
+    @patch.dict(os.environ, {'HF_API_KEY': ''})
     def test_init_no_api_key(self):
-        with patch.dict(os.environ, {}, clear=True):
-            with self.assertRaises(ConfigurationError) as context:
-                HuggingFaceEmbeddingAdapter("test-model")
-            
-            self.assertIn("HuggingFace API key must be provided", str(context.exception))
+        with self.assertRaises(ConfigurationError) as context:
+            HuggingFaceEmbeddingAdapter("test-model")
+        
+        self.assertIn("HuggingFace API key must be provided", str(context.exception))
 
     @patch.dict(os.environ, {'HF_API_KEY': 'env-key'})
-    @patch('model_connectors.HuggingFaceEndpointEmbeddings')
-    def test_init_api_key_from_env(self, mock_hf_embeddings):
-        mock_hf_embeddings.return_value = self.mock_embeddings
-        
+    def test_init_api_key_from_env(self):
         adapter = HuggingFaceEmbeddingAdapter("test-model")
         
         self.assertEqual(adapter.api_key, "env-key")
 
-    @patch('model_connectors.HuggingFaceEndpointEmbeddings')
-    def test_embed_documents_success(self, mock_hf_embeddings):
-        mock_hf_embeddings.return_value = self.mock_embeddings
+    def test_embed_documents_success(self):
+        result = self.adapter.embed_documents(["text1", "text2"])
         
-        adapter = HuggingFaceEmbeddingAdapter("test-model", "test-api-key")
-        result = adapter.embed_documents(["text1", "text2"])
+        np.testing.assert_allclose(result, _DOCUMENT_EMBEDDINGS, rtol=1e-6)
+
+    def test_embed_documents_single_call_per_batch(self):
+        self.mock_embeddings.embed_documents.side_effect = lambda batch: [[0.1] for _ in batch]
+        texts = [f"text{i}" for i in range(HuggingFaceEmbeddingAdapter._BATCH)]
+        
+        self.adapter.embed_documents(texts)
+        
+        self.mock_embeddings.embed_documents.assert_called_once_with(texts)
+
+    def test_embed_documents_batches(self):
+        self.mock_embeddings.embed_documents.side_effect = lambda batch: [[float(t)] for t in batch]
+        texts = [str(i) for i in range(70)]
+        
+        result = self.adapter.embed_documents(texts)
         
-        self.assertEqual(result, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        self.assertEqual(result.tolist(), [[float(i)] for i in range(70)])
+        self.assertEqual(self.mock_embeddings.embed_documents.call_count, 3)
 
 
 class TestLocalEmbeddingAdapter(unittest.TestCase):
     
+    # sentence_transformers(and torch) is imported by this patch, only when these tests run
+    @classmethod
+    def setUpClass(cls):
+        cls._patcher = patch('sentence_transformers.SentenceTransformer')
+        cls.mock_sentence_transformer = cls._patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+    
     def setUp(self):
+        # The model mock is rebuilt, tests consume and replace its encode results
         self.mock_model = Mock()
         
-        # Mock numpy array with tolist method
-        mock_embeddings_array = Mock()
-        mock_embeddings_array.tolist.return_value = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+        mock_embeddings_array = np.array(_DOCUMENT_EMBEDDINGS, dtype=np.float32)
+        self.mock_model.encode.side_effect = [mock_embeddings_array, _Array(_QUERY_EMBEDDING)]
         
-        mock_single_embedding_array = Mock()
-        mock_single_embedding_array.tolist.return_value = [0.1, 0.2, 0.3]
-        
-        self.mock_model.encode.side_effect = [mock_embeddings_array, mock_single_embedding_array]
+        self.mock_sentence_transformer.reset_mock(side_effect=True)
+        self.mock_sentence_transformer.return_value = self.mock_model
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_init_success(self, mock_sentence_transformer):
-        mock_sentence_transformer.return_value = self.mock_model
-        
+    def test_init_success(self):
         adapter = LocalEmbeddingAdapter("test-model")
         
         self.assertEqual(adapter.model_name, "test-model")
-        mock_sentence_transformer.assert_called_once_with("test-model")
+        self.mock_sentence_transformer.assert_called_once_with("test-model", device=adapter.device)
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_init_default_model(self, mock_sentence_transformer):
-        mock_sentence_transformer.return_value = self.mock_model
-        
+    def test_init_default_model(self):
         adapter = LocalEmbeddingAdapter()
         
         self.assertEqual(adapter.model_name, "paraphrase-multilingual-MiniLM-L12-v2")
 
+    @patch('torch.ao.quantization.quantize_dynamic')
+    @patch('torch.cuda.is_available', return_value=False)
+    def test_init_int8_quantization(self, mock_cuda, mock_quantize):
+        import torch
+        
+        adapter = LocalEmbeddingAdapter("test-model", quantize="int8")
+        
+        self.assertEqual(adapter.quantize, "int8")
+        mock_quantize.assert_called_once_with(self.mock_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    @patch('torch.ao.quantization.quantize_dynamic')
+    @patch('torch.cuda.is_available', return_value=False)
+    def test_embed_documents_cache_per_variant(self, mock_cuda, mock_quantize):
+        self.mock_model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 3), dtype=np.float32)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "emb.sqlite")
+            for quantize in (None, "int8", None):
+                adapter = LocalEmbeddingAdapter("test-model", quantize=quantize, cache_path=cache_path)
+                adapter.embed_documents(["a", "b"])
+                adapter._cache._conn.close()
+        
+        # The int8 model doesn't reuse the fp32 vectors, the second fp32 adapter does
+        self.assertEqual(self.mock_model.encode.call_count, 2)
+
+    @patch.dict(os.environ, {'QUANTIZE_LOCAL': 'int4'})
+    def test_init_unsupported_quantization(self):
+        with self.assertRaises(ConfigurationError) as context:
+            LocalEmbeddingAdapter("test-model")
+        
+        self.assertIn("Unsupported quantization", str(context.exception))
+
+    @patch('torch.compile')
+    @patch('torch.cuda.is_available', return_value=True)
+    def test_init_fp16_on_gpu(self, mock_cuda, mock_compile):
+        import torch
+        
+        mock_model = MagicMock()
+        mock_model.to.return_value = mock_model
+        self.mock_sentence_transformer.return_value = mock_model
+        
+        adapter = LocalEmbeddingAdapter("test-model", precision="fp16")
+        
+        self.assertEqual(adapter.device, "cuda")
+        mock_model.to.assert_called_once_with(torch.float16)
+        mock_compile.assert_called_once()
+        self.assertEqual(mock_compile.call_args.kwargs['mode'], 'reduce-overhead')
+
+    @patch.dict(os.environ, {'EMBED_PRECISION': 'fp8'})
+    def test_init_unsupported_precision(self):
+        with self.assertRaises(ConfigurationError) as context:
+            LocalEmbeddingAdapter("test-model")
+        
+        self.assertIn("Unsupported precision", str(context.exception))
+
     def test_init_empty_model_name(self):
         with self.assertRaises(ValueError) as context:
             LocalEmbeddingAdapter("")
         
         self.assertIn("Model name cannot be empty", str(context.exception))
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_init_model_load_error(self, mock_sentence_transformer):
-        mock_sentence_transformer.side_effect = Exception("Model load failed")
+    def test_init_model_load_error(self):
+        self.mock_sentence_transformer.side_effect = Exception("Model load failed")
         
         with self.assertRaises(ModelLoadError) as context:
             LocalEmbeddingAdapter("test-model")
         
         self.assertIn("Failed to load local embeddings model", str(context.exception))
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_embed_documents_success(self, mock_sentence_transformer):
-        mock_sentence_transformer.return_value = self.mock_model
-        
+    def test_embed_documents_success(self):
         adapter = LocalEmbeddingAdapter("test-model")
         result = adapter.embed_documents(["text1", "text2"])
         
-        self.assertEqual(result, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, _DOCUMENT_EMBEDDINGS, rtol=1e-6)
         self.mock_model.encode.assert_called_with(
             ["text1", "text2"], 
-            convert_to_tensor=False, 
+            batch_size=128,
+            convert_to_numpy=True, 
             normalize_embeddings=True
         )
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_embed_documents_empty_list(self, mock_sentence_transformer):
-        mock_sentence_transformer.return_value = self.mock_model
+    def test_embed_documents_single_encode_call(self):
+        self.mock_model.encode.side_effect = lambda texts, **kwargs: np.zeros((len(texts), 3), dtype=np.float32)
+        texts = [f"text{i}" for i in range(300)]
         
         adapter = LocalEmbeddingAdapter("test-model")
-        result = adapter.embed_documents([])
+        result = adapter.embed_documents(texts)
         
-        self.assertEqual(result, [])
+        # The model batches internally, all texts go through one encode call
+        self.assertEqual(result.shape, (300, 3))
+        self.mock_model.encode.assert_called_once()
+        self.assertEqual(self.mock_model.encode.call_args.args[0], texts)
 
-    @patch('model_connectors.SentenceTransformer')
-    def test_embed_query_success(self, mock_sentence_transformer):
-        # Setup separate mock for single embedding
-        mock_single_array = Mock()
-        mock_single_array.tolist.return_value = [0.1, 0.2, 0.3]
-        self.mock_model.encode.return_value = [mock_single_array]
+    def test_embed_documents_empty_list(self):
+        self.mock_model.get_sentence_embedding_dimension.return_value = 3
+        adapter = LocalEmbeddingAdapter("test-model")
+        result = adapter.embed_documents([])
         
-        mock_sentence_transformer.return_value = self.mock_model
+        # Same type as a non-empty result, with the model's dimension
+        self.assertEqual(result.shape, (0, 3))
+        self.assertEqual(result.dtype, np.float32)
+
+    def test_embed_query_success(self):
+        self.mock_model.encode.side_effect = None
+        self.mock_model.encode.return_value = [_Array(_QUERY_EMBEDDING)]
         
         adapter = LocalEmbeddingAdapter("test-model")
         result = adapter.embed_query("test query")
         
-        self.assertEqual(result, [0.1, 0.2, 0.3])
+        self.assertEqual(result, _QUERY_EMBEDDING)
         self.mock_model.encode.assert_called_with(
             ["test query"], 
-            convert_to_tensor=False, 
+            batch_size=64,
+            convert_to_numpy=True, 
             normalize_embeddings=True
         )
 
 
-class TestEmbeddingAdapterFactory(unittest.TestCase):
+class TestQueryBatcher(unittest.TestCase):
     
-    @patch('model_connectors.GoogleEmbeddingAdapter')
-    def test_create_adapter_google(self, mock_google_adapter):
-        mock_adapter_instance = Mock()
-        mock_google_adapter.return_value = mock_adapter_instance
+    def test_concurrent_queries_share_one_call(self):
+        encoding = threading.Event()
+        release = threading.Event()
+        
+        def encode(texts):
+            encoding.set()
+            release.wait(timeout=5)
+            return [t.upper() for t in texts]
+        
+        encode_fn = Mock(side_effect=encode)
+        batcher = _QueryBatcher(encode_fn)
+        
+        # Queries arriving while "a" is encoded are batched together
+        futures = [batcher.submit("a")]
+        self.assertTrue(encoding.wait(timeout=5))
+        futures += [batcher.submit(t) for t in ["b", "c"]]
+        release.set()
+        
+        self.assertEqual([f.result(timeout=5) for f in futures], ["A", "B", "C"])
+        self.assertEqual([c.args[0] for c in encode_fn.call_args_list], [["a"], ["b", "c"]])
+
+    def test_encode_error_propagates(self):
+        batcher = _QueryBatcher(Mock(side_effect=Exception("Encode failed")))
         
-        result = EmbeddingAdapterFactory.create_adapter("test-model", "google", "api-key")
+        with self.assertRaises(Exception) as context:
+            batcher.submit("a").result(timeout=5)
         
-        self.assertEqual(result, mock_adapter_instance)
-        mock_google_adapter.assert_called_once_with("test-model", "api-key")
+        self.assertIn("Encode failed", str(context.exception))
 
-    @patch('model_connectors.HuggingFaceEmbeddingAdapter')
-    def test_create_adapter_huggingface(self, mock_hf_adapter):
-        mock_adapter_instance = Mock()
-        mock_hf_adapter.return_value = mock_adapter_instance
+    def test_missing_vectors_fail_every_query(self):
+        encoding = threading.Event()
+        release = threading.Event()
+        
+        def encode(texts):
+            encoding.set()
+            release.wait(timeout=5)
+            return [t.upper() for t in texts][:1]
         
-        result = EmbeddingAdapterFactory.create_adapter("test-model", "huggingface", "api-key")
+        batcher = _QueryBatcher(encode)
         
-        self.assertEqual(result, mock_adapter_instance)
-        mock_hf_adapter.assert_called_once_with("test-model", "api-key")
+        first = batcher.submit("a")
+        self.assertTrue(encoding.wait(timeout=5))
+        futures = [batcher.submit(t) for t in ["b", "c"]]
+        release.set()
+        
+        self.assertEqual(first.result(timeout=5), "A")
+        for future in futures:
+            with self.assertRaises(EmbeddingGenerationError) as context:
+                future.result(timeout=5)
+            self.assertIn("Expected 2 query embeddings, got 1", str(context.exception))
 
-    @patch('model_connectors.LocalEmbeddingAdapter')
-    def test_create_adapter_local(self, mock_local_adapter):
-        mock_adapter_instance = Mock()
-        mock_local_adapter.return_value = mock_adapter_instance
+    def test_worker_exits_when_idle(self):
+        batcher = _QueryBatcher(lambda texts: texts)
         
-        result = EmbeddingAdapterFactory.create_adapter("test-model", "local")
+        self.assertEqual(batcher.submit("a").result(timeout=5), "a")
+        worker = batcher._worker
+        if worker is not None:
+            worker.join(timeout=5)
+        self.assertIsNone(batcher._worker)
         
-        self.assertEqual(result, mock_adapter_instance)
-        mock_local_adapter.assert_called_once_with("test-model")
+        # A new worker is started for the next query
+        self.assertEqual(batcher.submit("b").result(timeout=5), "b")
+
+
+class TestEmbeddingAdapterFactory(unittest.TestCase):
+    
+    # The registered adapter classes are patched once for the whole class, reset before each test
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_adapters = {name: Mock(name=name) for name in
+                             ("GoogleEmbeddingAdapter", "HuggingFaceEmbeddingAdapter", "LocalEmbeddingAdapter")}
+        cls._patcher = patch.dict(EmbeddingAdapterFactory._REGISTRY, {
+            'google': cls.mock_adapters["GoogleEmbeddingAdapter"],
+            'huggingface': cls.mock_adapters["HuggingFaceEmbeddingAdapter"],
+            'local': cls.mock_adapters["LocalEmbeddingAdapter"]
+        })
+        cls._patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+    
+    def setUp(self):
+        for mock_adapter in self.mock_adapters.values():
+            mock_adapter.reset_mock()
+    
+    def test_create_adapter_dispatch(self):
+        # (provider, adapter class, factory api_key argument, expected constructor args)
+        cases = [
+            ("google", "GoogleEmbeddingAdapter", "api-key", ("test-model", "api-key")),
+            ("huggingface", "HuggingFaceEmbeddingAdapter", "api-key", ("test-model", "api-key")),
+            ("local", "LocalEmbeddingAdapter", None, ("test-model",)),
+        ]
+        
+        for provider, adapter_class, api_key, expected_args in cases:
+            result = EmbeddingAdapterFactory.create_adapter("test-model", provider, api_key)
+            
+            self.assertEqual(result, self.mock_adapters[adapter_class].return_value, provider)
+            self.mock_adapters[adapter_class].assert_called_once_with(*expected_args)
+            self.mock_adapters[adapter_class].reset_mock()
 
     def test_create_adapter_unknown_provider(self):
         with self.assertRaises(ValueError) as context:
@@ -319,6 +522,17 @@ class TestEmbeddingAdapterFactory(unittest.TestCase):
         
         self.assertIn("Unknown provider: unknown", str(context.exception))
 
+    def test_import_does_not_load_provider_sdks(self):
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("import sys, model_connectors; "
+                "print([m for m in ('torch', 'sentence_transformers', 'langchain_google_genai', "
+                "'langchain_huggingface') if m in sys.modules])")
+        
+        output = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                capture_output=True, text=True, check=True).stdout
+        
+        self.assertEqual(output.strip(), "[]")
+
     def test_create_adapter_empty_model_name(self):
         with self.assertRaises(ValueError) as context:
             EmbeddingAdapterFactory.create_adapter("", "google")
@@ -332,19 +546,11 @@ class TestEmbeddingAdapterFactory(unittest.TestCase):
         self.assertIn("Provider cannot be empty", str(context.exception))
 
     def test_create_adapter_case_insensitive_provider(self):
-        with patch('model_connectors.GoogleEmbeddingAdapter') as mock_google_adapter:
-            mock_adapter_instance = Mock()
-            mock_google_adapter.return_value = mock_adapter_instance
-            
-            result = EmbeddingAdapterFactory.create_adapter("test-model", "GOOGLE", "api-key")
-            
-            self.assertEqual(result, mock_adapter_instance)
-
-    @patch('model_connectors.GoogleEmbeddingAdapter')
-    def test_create_from_config_success(self, mock_google_adapter):
-        mock_adapter_instance = Mock()
-        mock_google_adapter.return_value = mock_adapter_instance
+        result = EmbeddingAdapterFactory.create_adapter("test-model", "GOOGLE", "api-key")
         
+        self.assertEqual(result, self.mock_adapters['GoogleEmbeddingAdapter'].return_value)
+
+    def test_create_from_config_success(self):
         config = {
             'model_name': 'test-model',
             'provider': 'google',
@@ -353,7 +559,7 @@ class TestEmbeddingAdapterFactory(unittest.TestCase):
         
         result = EmbeddingAdapterFactory.create_from_config(config)
         
-        self.assertEqual(result, mock_adapter_instance)
+        self.assertEqual(result, self.mock_adapters['GoogleEmbeddingAdapter'].return_value)
 
     def test_create_from_config_none_config(self):
         with self.assertRaises(ValueError) as context:
@@ -383,11 +589,7 @@ class TestEmbeddingAdapterFactory(unittest.TestCase):
         
         self.assertIn("Model name must be specified in config", str(context.exception))
 
-    @patch('model_connectors.LocalEmbeddingAdapter')
-    def test_create_from_config_local_no_api_key(self, mock_local_adapter):
-        mock_adapter_instance = Mock()
-        mock_local_adapter.return_value = mock_adapter_instance
-        
+    def test_create_from_config_local_no_api_key(self):
         config = {
             'model_name': 'test-model',
             'provider': 'local'
@@ -395,8 +597,8 @@ class TestEmbeddingAdapterFactory(unittest.TestCase):
         
         result = EmbeddingAdapterFactory.create_from_config(config)
         
-        self.assertEqual(result, mock_adapter_instance)
-        mock_local_adapter.assert_called_once_with("test-model")
+        self.assertEqual(result, self.mock_adapters['LocalEmbeddingAdapter'].return_value)
+        self.mock_adapters['LocalEmbeddingAdapter'].assert_called_once_with("test-model")
 
 
 if __name__ == '__main__':
@@ -1,9 +1,6 @@
 import unittest
 from unittest.mock import patch
-import sys
-import os
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import types
 
 from parsers import (
     WikiSectionParser, Parser, LineType, 
@@ -43,7 +40,17 @@ class TestLineType(unittest.TestCase):
         line = "== תוספת ראשונה =="
         result = get_line_type(line)
         self.assertEqual(result, LineType.ADDENDUM)
-    
+
+    def test_get_line_type_heading_with_several_keywords(self):
+        test_cases = {
+            "== פרק ג' - תחולת חלק זה ==": LineType.PART,
+            "=== סימן ב' לפרק א' ===": LineType.CHAPTER,
+            "== חלק ב' לתוספת ==": LineType.ADDENDUM
+        }
+
+        results = [get_line_type(line) for line in test_cases]
+        self.assertListEqual(results, list(test_cases.values()))
+
     def test_get_line_type_metadata(self):
         test_cases = [
             "<שם>חוק הבטיחות</שם>",
@@ -53,10 +60,8 @@ class TestLineType(unittest.TestCase):
             "<פרסום>תאריך פרסום</פרסום>"
         ]
         
-        for line in test_cases:
-            with self.subTest(line=line):
-                result = get_line_type(line)
-                self.assertEqual(result, LineType.METADATA)
+        results = [get_line_type(line) for line in test_cases]
+        self.assertListEqual(results, [LineType.METADATA] * len(test_cases))
     
     def test_get_line_type_regular(self):
         line = "זהו טקסט רגיל של חוק."
@@ -70,15 +75,16 @@ class TestLineType(unittest.TestCase):
         result = get_line_type("   ")
         self.assertEqual(result, LineType.REGULAR)
     
-    def test_get_line_type_none_input(self):
-        with self.assertRaises(ValueError) as context:
-            get_line_type(None)
-        self.assertIn("Line cannot be None", str(context.exception))
-    
-    def test_get_line_type_non_string_input(self):
-        with self.assertRaises(ValueError) as context:
-            get_line_type(123)
-        self.assertIn("Line must be a string", str(context.exception))
+    def test_get_line_type_input_validation(self):
+        cases = [
+            (None, "Line cannot be None"),
+            (123, "Line must be a string")
+        ]
+        
+        for value, message in cases:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, message):
+                    get_line_type(value)
 
 
 class TestGetSectionProperties(unittest.TestCase):
@@ -111,27 +117,18 @@ class TestGetSectionProperties(unittest.TestCase):
         self.assertEqual(result['section_num'], '1')
         self.assertEqual(result['section_text'], '')
     
-    def test_get_section_properties_invalid_line(self):
-        line = "זהו לא סעיף"
+    def test_get_section_properties_input_validation(self):
+        cases = [
+            ("זהו לא סעיף", "This is not a valid section line"),
+            (None, "Line cannot be None"),
+            ("", "Line cannot be empty"),
+            (123, "Line must be a string")
+        ]
         
-        with self.assertRaises(ValueError) as context:
-            get_section_properties(line)
-        self.assertIn("This is not a valid section line", str(context.exception))
-    
-    def test_get_section_properties_none_input(self):
-        with self.assertRaises(ValueError) as context:
-            get_section_properties(None)
-        self.assertIn("Line cannot be None", str(context.exception))
-    
-    def test_get_section_properties_empty_input(self):
-        with self.assertRaises(ValueError) as context:
-            get_section_properties("")
-        self.assertIn("Line cannot be empty", str(context.exception))
-    
-    def test_get_section_properties_non_string_input(self):
-        with self.assertRaises(ValueError) as context:
-            get_section_properties(123)
-        self.assertIn("Line must be a string", str(context.exception))
+        for value, message in cases:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, message):
+                    get_section_properties(value)
 
 
 class TestParser(unittest.TestCase):
@@ -144,21 +141,21 @@ class TestParser(unittest.TestCase):
         result = Parser.parse_many([])
         self.assertEqual(result, [])
     
-    def test_parse_many_none_input(self):
-        with self.assertRaises(ValueError) as context:
-            Parser.parse_many(None)
-        self.assertIn("Documents list cannot be None", str(context.exception))
-    
-    def test_parse_many_non_list_input(self):
-        with self.assertRaises(ValueError) as context:
-            Parser.parse_many("not a list")
-        self.assertIn("Documents must be a list", str(context.exception))
+    def test_parse_many_input_validation(self):
+        cases = [
+            (None, "Documents list cannot be None"),
+            ("not a list", "Documents must be a list")
+        ]
+        
+        for value, message in cases:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, message):
+                    Parser.parse_many(value)
 
 
 class TestWikiSectionParser(unittest.TestCase):
     
-    def setUp(self):
-        self.sample_document = """<שם>חוק הבטיחות</שם>
+    sample_document = """<שם>חוק הבטיחות</שם>
 <מקור>ספר החוקים הפתוח</מקור>
 
 = חלק א' - הוראות כלליות =
@@ -179,11 +176,21 @@ class TestWikiSectionParser(unittest.TestCase):
 
 <פרסום>נפרסם בירחון רשמי</פרסום>"""
 
-        self.minimal_document = """<שם>חוק פשוט</שם>
+    minimal_document = """<שם>חוק פשוט</שם>
 @ 1. סעיף יחיד."""
 
+    @classmethod
+    def setUpClass(cls):
+        # Parsed once for the tests only reading the result
+        WikiSectionParser.clear_parse_cache()
+        cls.parsed_sample_document = WikiSectionParser.parse(cls.sample_document)
+        cls.parsed_minimal_document = WikiSectionParser.parse(cls.minimal_document)
+    
+    def setUp(self):
+        WikiSectionParser.clear_parse_cache()
+
     def test_parse_success(self):
-        result = WikiSectionParser.parse(self.sample_document)
+        result = self.parsed_sample_document
         
         self.assertIsInstance(result, list)
         self.assertGreater(len(result), 0)
@@ -199,7 +206,7 @@ class TestWikiSectionParser(unittest.TestCase):
         self.assertEqual(first_block['law_name'], 'חוק הבטיחות')
 
     def test_parse_minimal_document(self):
-        result = WikiSectionParser.parse(self.minimal_document)
+        result = self.parsed_minimal_document
         
         self.assertGreater(len(result), 0)
         section_block = None
@@ -214,7 +221,7 @@ class TestWikiSectionParser(unittest.TestCase):
         self.assertEqual(section_block['text'], 'סעיף יחיד.')
 
     def test_parse_document_with_sections(self):
-        result = WikiSectionParser.parse(self.sample_document)
+        result = self.parsed_sample_document
         
         sections = [block for block in result if block['section'] is not None]
         self.assertGreater(len(sections), 0)
@@ -225,25 +232,22 @@ class TestWikiSectionParser(unittest.TestCase):
         self.assertEqual(section_1['chapter'], '== פרק ראשון - הגדרות ==')
 
     def test_parse_document_with_metadata(self):
-        result = WikiSectionParser.parse(self.sample_document)
+        result = self.parsed_sample_document
         
         metadata_blocks = [block for block in result if block['part'] == 'metadata']
         self.assertGreater(len(metadata_blocks), 0)
 
-    def test_parse_none_document(self):
-        with self.assertRaises(ValueError) as context:
-            WikiSectionParser.parse(None)
-        self.assertIn("Document cannot be None", str(context.exception))
-
-    def test_parse_empty_document(self):
-        with self.assertRaises(ValueError) as context:
-            WikiSectionParser.parse("")
-        self.assertIn("Document cannot be empty", str(context.exception))
-
-    def test_parse_non_string_document(self):
-        with self.assertRaises(ValueError) as context:
-            WikiSectionParser.parse(123)
-        self.assertIn("Document must be a string", str(context.exception))
+    def test_parse_input_validation(self):
+        cases = [
+            (None, "Document cannot be None"),
+            ("", "Document cannot be empty"),
+            (123, "Document must be a string")
+        ]
+        
+        for value, message in cases:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, message):
+                    WikiSectionParser.parse(value)
 
     def test_parse_document_no_law_name(self):
         document = """@ 1. סעיף ללא שם חוק."""
@@ -283,28 +287,43 @@ class TestWikiSectionParser(unittest.TestCase):
         self.assertEqual(section_1['sign'], '=== סימן א\' ===')
         self.assertEqual(section_3['sign'], '=== סימן ב\' ===')
 
+    def test_iter_parse_yields_blocks(self):
+        blocks = WikiSectionParser.iter_parse(self.sample_document)
+        
+        self.assertIsInstance(blocks, types.GeneratorType)
+        self.assertEqual(list(blocks), WikiSectionParser.parse(self.sample_document))
+
+    def test_iter_parse_raises_while_iterating(self):
+        blocks = WikiSectionParser.iter_parse("")
+        
+        with self.assertRaises(ValueError):
+            next(blocks)
+
     def test_parse_many_success(self):
-        documents = [self.minimal_document, self.sample_document]
+        # parse_many is under test here, not the parsing, one-section documents are enough
+        documents = ["<שם>חוק א\n@ 1. סעיף.", "<שם>חוק ב\n@ 1. סעיף."]
         
         result = WikiSectionParser.parse_many(documents)
         
         self.assertEqual(len(result), 2)
         self.assertIsInstance(result[0], list)
         self.assertIsInstance(result[1], list)
+        self.assertEqual([blocks[0]['law_name'] for blocks in result], ["חוק א", "חוק ב"])
 
     def test_parse_many_empty_list(self):
         result = WikiSectionParser.parse_many([])
         self.assertEqual(result, [])
 
-    def test_parse_many_none_input(self):
-        with self.assertRaises(ValueError) as context:
-            WikiSectionParser.parse_many(None)
-        self.assertIn("Documents list cannot be None", str(context.exception))
-
-    def test_parse_many_non_list_input(self):
-        with self.assertRaises(ValueError) as context:
-            WikiSectionParser.parse_many("not a list")
-        self.assertIn("Documents must be a list", str(context.exception))
+    def test_parse_many_input_validation(self):
+        cases = [
+            (None, "Documents list cannot be None"),
+            ("not a list", "Documents must be a list")
+        ]
+        
+        for value, message in cases:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, message):
+                    WikiSectionParser.parse_many(value)
 
     def test_parse_many_partial_failure(self):
         documents = [self.minimal_document, "", self.sample_document]
@@ -313,6 +332,15 @@ class TestWikiSectionParser(unittest.TestCase):
         
         self.assertEqual(len(result), 2)
 
+    def test_parse_many_parallel_preserves_order(self):
+        documents = [f"<שם>חוק {i}\n@ 1. סעיף" for i in range(6)]
+        
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                result = WikiSectionParser.parse_many(documents, workers=workers)
+                
+                self.assertEqual([r[0]['law_name'] for r in result], [f"חוק {i}" for i in range(6)])
+
     def test_parse_many_complete_failure(self):
         documents = ["", "   ", None]
         
@@ -320,6 +348,35 @@ class TestWikiSectionParser(unittest.TestCase):
             WikiSectionParser.parse_many(documents)
         self.assertIn("Failed to parse any documents", str(context.exception))
 
+    def test_parse_classifies_only_heading_section_and_metadata_lines(self):
+        document = "<שם>חוק</שם>\n= פרק א' =\n@ 1. סעיף ראשון\nהמשך הסעיף\n(א) פסקה\n@ 2. סעיף שני"
+        
+        with patch('parsers.get_line_type', wraps=get_line_type) as mock_get_line_type:
+            result = WikiSectionParser.parse(document)
+        
+        self.assertEqual([c.args[0] for c in mock_get_line_type.call_args_list],
+                         ["<שם>חוק</שם>", "= פרק א' =", "@ 1. סעיף ראשון", "@ 2. סעיף שני"])
+        self.assertEqual(result[1]['text'], "סעיף ראשוןהמשך הסעיף(א) פסקה")
+
+    def test_parse_line_breaks_like_splitlines(self):
+        document = "<שם>חוק\r\n@ 1. סעיף\rהמשך\u2028@ 2. שני\x85עוד\n"
+        
+        result = WikiSectionParser.parse(document)
+        
+        self.assertEqual([(b['section'], b['text']) for b in result],
+                         [(None, "<שם>חוק"), ('1', "סעיףהמשך"), ('2', "שניעוד")])
+
+    def test_parse_caches_identical_documents(self):
+        first = WikiSectionParser.parse(self.sample_document)
+        first[0]['text'] = 'changed'
+        
+        with patch('parsers.get_line_type', wraps=get_line_type) as mock_get_line_type:
+            second = WikiSectionParser.parse(self.sample_document)
+        
+        mock_get_line_type.assert_not_called()
+        self.assertNotEqual(second[0]['text'], 'changed')
+        self.assertEqual(second[1:], first[1:])
+
     @patch('parsers.get_line_type')
     def test_parse_line_type_error(self, mock_get_line_type):
         mock_get_line_type.side_effect = Exception("Line type error")
@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from pipeline import run_pipeline
+from fetchers import NetworkError
+from storers import PineconeStorer, StorageError
+from model_connectors import EmbeddingAdapter
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_storer = Mock()
+
+    def _parse(self, content):
+        # One chunk per line of the fetched content
+        return [{'text': line, 'law_name': content.split(':')[0]} for line in content.splitlines()]
+
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_success(self, mock_fetch_one, mock_parse):
+        mock_fetch_one.side_effect = lambda name, **kwargs: f"{name}:a\n{name}:b"
+        mock_parse.side_effect = self._parse
+        
+        summary = run_pipeline(self.mock_storer, ["law1", "law2", "law3"])
+        
+        self.assertEqual(summary, {'laws': 3, 'chunks': 6, 'failed_laws': []})
+        stored = [chunk for c in self.mock_storer.store.call_args_list for chunk in c.args[0]]
+        self.assertCountEqual([chunk['text'] for chunk in stored],
+                              [f"law{i}:{s}" for i in range(1, 4) for s in "ab"])
+
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_counts_fetched_laws(self, mock_fetch_one, mock_parse):
+        mock_fetch_one.side_effect = lambda name, **kwargs: name
+        # Chunks without a law name(no <שם> tag) and two laws sharing one name
+        mock_parse.side_effect = lambda content: [{'text': content, 'law_name': None if content < "law3" else "חוק"}]
+        
+        summary = run_pipeline(self.mock_storer, ["law1", "law2", "law3", "law4"])
+        
+        self.assertEqual(summary['laws'], 4)
+        self.assertEqual(summary['chunks'], 4)
+
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_batches(self, mock_fetch_one, mock_parse):
+        mock_fetch_one.side_effect = lambda name, **kwargs: "\n".join(f"{name}:{i}" for i in range(10))
+        mock_parse.side_effect = self._parse
+        
+        summary = run_pipeline(self.mock_storer, [f"law{i}" for i in range(5)], batch_size=20)
+        
+        self.assertEqual(summary['chunks'], 50)
+        batch_sizes = [len(c.args[0]) for c in self.mock_storer.store.call_args_list]
+        self.assertEqual(batch_sizes, [20, 20, 10])
+
+    @patch('storers.Pinecone')
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_embeds_duplicates_once(self, mock_fetch_one, mock_parse, mock_pinecone):
+        mock_fetch_one.return_value = "content"
+        mock_parse.return_value = [{'text': 'same', 'law_name': 'law'}, {'text': 'same', 'law_name': 'law'},
+                                   {'text': 'other', 'law_name': 'law'}]
+        adapter = Mock(spec=EmbeddingAdapter)
+        adapter.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        storer = PineconeStorer(api_key="test_key", embedding_adapter=adapter)
+        
+        run_pipeline(storer, ["law"])
+        
+        # Duplicate texts are embedded once by the storer
+        adapter.embed_documents.assert_called_once_with(['same', 'other'])
+        upserted = mock_pinecone.return_value.Index.return_value.upsert.call_args.kwargs['vectors']
+        self.assertEqual([v['values'] for v in upserted], [[4.0], [4.0], [5.0]])
+
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_partial_failure(self, mock_fetch_one, mock_parse):
+        def fetch_one(name, **kwargs):
+            if name == "broken":
+                raise NetworkError("Network error")
+            if name == "empty":
+                return None
+            return f"{name}:a"
+        mock_fetch_one.side_effect = fetch_one
+        mock_parse.side_effect = self._parse
+        
+        summary = run_pipeline(self.mock_storer, ["law1", "broken", "empty"])
+        
+        self.assertEqual(summary['laws'], 1)
+        self.assertEqual(summary['chunks'], 1)
+        self.assertCountEqual([f['law_name'] for f in summary['failed_laws']], ["broken", "empty"])
+
+    @patch('pipeline.WikiSectionParser.iter_parse')
+    @patch('pipeline.WikiFetcher.fetch_one')
+    def test_run_pipeline_store_error_stops_stages(self, mock_fetch_one, mock_parse):
+        mock_fetch_one.side_effect = lambda name, **kwargs: "\n".join(f"{name}:{i}" for i in range(50))
+        mock_parse.side_effect = self._parse
+        self.mock_storer.store.side_effect = StorageError("Upsert failed")
+        
+        with self.assertRaises(StorageError):
+            run_pipeline(self.mock_storer, [f"law{i}" for i in range(100)], batch_size=10)
+        
+        # The fetch stage stops early instead of fetching every law
+        self.assertLess(mock_fetch_one.call_count, 100)
+
+    @patch('pipeline.ThreadPoolExecutor')
+    def test_run_pipeline_stage_error_is_raised(self, mock_executor):
+        mock_executor.side_effect = RuntimeError("can't start new thread")
+        
+        # The failed fetch stage still ends the parse and store stages instead of leaving them waiting
+        with self.assertRaises(RuntimeError) as context:
+            run_pipeline(self.mock_storer, ["law"])
+        
+        self.assertIn("can't start new thread", str(context.exception))
+        self.mock_storer.store.assert_not_called()
+
+    def test_run_pipeline_invalid_batch_size(self):
+        with self.assertRaises(ValueError) as context:
+            run_pipeline(self.mock_storer, ["law"], batch_size=0)
+        
+        self.assertIn("Batch size must be positive", str(context.exception))
+
+    def test_run_pipeline_no_laws(self):
+        summary = run_pipeline(self.mock_storer, [])
+        
+        self.assertEqual(summary, {'laws': 0, 'chunks': 0, 'failed_laws': []})
+        self.mock_storer.store.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()